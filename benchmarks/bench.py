@@ -0,0 +1,364 @@
+"""
+Benchmarks for scriv.
+
+Synthetic fragments and changelogs are generated in a temporary directory,
+then scriv's parsing, combining, reading, writing, and commands are timed.
+Results are written as JSON so they can be compared between scriv versions::
+
+    $ python benchmarks/bench.py --output bench.json
+    $ python benchmarks/bench.py --quick
+
+Use ``--max-startup`` to fail if starting ``scriv --help`` is too slow.
+
+Each result has the best time of several runs, the throughput in items per
+second (the items are named in the result), and the peak memory allocated
+by Python during one run.
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from click.testing import CliRunner
+
+import scriv
+from scriv.changelog import Changelog
+from scriv.cli import cli
+from scriv.config import Config
+from scriv.format import get_format_tools
+from scriv.scriv import Scriv, _files_to_combine
+
+CATEGORIES = ["Removed", "Added", "Changed", "Deprecated", "Fixed", "Security"]
+
+FULL_SIZES = {"fragments": [10_000, 100_000], "entries": [1_000, 20_000]}
+QUICK_SIZES = {"fragments": [1_000], "entries": [1_000]}
+
+
+def fragment_text(fmt: str, num: int) -> str:
+    """Make the text of one fragment, in a category chosen by `num`."""
+    category = CATEGORIES[num % len(CATEGORIES)]
+    bullet = (
+        f"- Change number {num} was made, and this is a longer description\n"
+        + "  of it that wraps onto a second line.\n"
+    )
+    if fmt == "rst":
+        return f"{category}\n{'-' * len(category)}\n\n{bullet}"
+    return f"# {category}\n\n{bullet}"
+
+
+def make_fragments(directory: Path, fmt: str, count: int) -> None:
+    """Write `count` fragment files into `directory`."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for num in range(count):
+        name = f"20200101_{num:08d}_bench.{fmt}"
+        (directory / name).write_text(fragment_text(fmt, num), encoding="utf-8")
+
+
+def changelog_text(fmt: str, entries: int) -> str:
+    """Make the text of a changelog with `entries` entries."""
+    config = Config(format=fmt)
+    tools = get_format_tools(fmt, config)
+    parts = []
+    for num in range(entries, 0, -1):
+        version = f"1.{num // 100}.{num % 100}"
+        title = f"{version} — 2020-01-01"
+        parts.append(tools.format_header(title, anchor=f"changelog-{version}"))
+        sections = {
+            cat: [f"- Change {num}.{i} in {cat}." for i in range(3)]
+            for cat in CATEGORIES[num % 3 : num % 3 + 3]
+        }
+        parts.append(tools.format_sections(sections))
+    comment = (
+        "<!-- scriv-insert-here -->" if fmt == "md" else ".. scriv-insert-here"
+    )
+    return f"{comment}\n" + "".join(parts)
+
+
+def measure(
+    name: str,
+    func: Callable[[], Any],
+    items: int,
+    item_name: str,
+    *,
+    setup: Callable[[], Any] | None = None,
+    repeat: int = 3,
+) -> dict[str, Any]:
+    """
+    Time `func`, returning a result dict.
+
+    `setup` is called before each run, and isn't timed.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(times)
+    result = {
+        "name": name,
+        "seconds": best,
+        "items": items,
+        "item_name": item_name,
+        "items_per_second": items / best if best else None,
+        "peak_memory_bytes": peak,
+    }
+    print(
+        f"{name:<45} {best:9.4f}s {result['items_per_second'] or 0:14,.0f} "
+        + f"{item_name}/s {peak / 1e6:9.1f} MB",
+        file=sys.stderr,
+    )
+    return result
+
+
+@contextlib.contextmanager
+def project_dir(fmt: str) -> Iterator[Path]:
+    """Make a temporary project directory for `fmt`, and chdir into it."""
+    old_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="scriv_bench_") as tmp:
+        os.chdir(tmp)
+        try:
+            changelog_d = Path("changelog.d")
+            changelog_d.mkdir()
+            (changelog_d / "scriv.ini").write_text(
+                f"[scriv]\nformat = {fmt}\n", encoding="utf-8"
+            )
+            yield Path(tmp)
+        finally:
+            os.chdir(old_dir)
+
+
+def run_cli(args: list[str]) -> None:
+    """Run a scriv command, and fail if it fails."""
+    result = CliRunner().invoke(cli, args)
+    if result.exit_code != 0:
+        raise RuntimeError(f"scriv {' '.join(args)} failed:\n{result.output}")
+
+
+def bench_fragments(fmt: str, count: int) -> list[dict[str, Any]]:
+    """Benchmarks of working with `count` fragments."""
+    results = []
+    with project_dir(fmt):
+        make_fragments(Path("changelog.d"), fmt, count)
+        scriv_ = Scriv(config=Config.read())
+        config = scriv_.config
+        tag = f"{fmt} {count:,} fragments"
+
+        results.append(
+            measure(
+                f"_files_to_combine, {tag}",
+                lambda: _files_to_combine(config),
+                count,
+                "fragments",
+            )
+        )
+        frags = scriv_.fragments_to_combine()
+        results.append(
+            measure(
+                f"combine_fragments, {tag}",
+                lambda: scriv_.combine_fragments(frags),
+                count,
+                "fragments",
+            )
+        )
+        tools = get_format_tools(fmt, config)
+        text = "\n\n".join(fragment_text(fmt, num) for num in range(count))
+        results.append(
+            measure(
+                f"parse_text, {tag}",
+                lambda: tools.parse_text(text),
+                len(text.splitlines()),
+                "lines",
+            )
+        )
+        sections = scriv_.combine_fragments(frags)
+        results.append(
+            measure(
+                f"format_sections, {tag}",
+                lambda: tools.format_sections(sections),
+                count,
+                "fragments",
+            )
+        )
+        results.append(
+            measure(
+                f"print, {tag}", lambda: run_cli(["print"]), count, "fragments"
+            )
+        )
+
+        changelog = Path(f"CHANGELOG.{fmt}")
+        results.append(
+            measure(
+                f"collect, {tag}",
+                lambda: run_cli(["collect", "--keep", "--title", "Bench"]),
+                count,
+                "fragments",
+                setup=lambda: changelog.write_text(
+                    changelog_text(fmt, 10), encoding="utf-8"
+                ),
+            )
+        )
+    return results
+
+
+def bench_changelog(fmt: str, entries: int) -> list[dict[str, Any]]:
+    """Benchmarks of working with a changelog of `entries` entries."""
+    results = []
+    with project_dir(fmt):
+        text = changelog_text(fmt, entries)
+        path = Path(f"CHANGELOG.{fmt}")
+        path.write_text(text, encoding="utf-8")
+        config = Config.read()
+        size = len(text.encode("utf-8"))
+        tag = f"{fmt} {entries:,} entries"
+
+        def read() -> Changelog:
+            changelog = Changelog(path=path, config=config)
+            changelog.read()
+            return changelog
+
+        results.append(measure(f"Changelog.read, {tag}", read, size, "bytes"))
+        changelog = read()
+        results.append(
+            measure(f"Changelog.write, {tag}", changelog.write, size, "bytes")
+        )
+        results.append(
+            measure(
+                f"Changelog.entries, {tag}",
+                changelog.entries,
+                entries,
+                "entries",
+            )
+        )
+        results.append(
+            measure(
+                f"Changelog.iter_entries, {tag}",
+                lambda: list(changelog.iter_entries()),
+                entries,
+                "entries",
+            )
+        )
+        tools = get_format_tools(fmt, config)
+        results.append(
+            measure(
+                f"parse_text, {tag}",
+                lambda: tools.parse_text(text),
+                len(text.splitlines()),
+                "lines",
+            )
+        )
+        # The oldest version is the worst case: the whole file is parsed.
+        results.append(
+            measure(
+                f"print --version (oldest), {tag}",
+                lambda: run_cli(["print", "--version", "1.0.1"]),
+                entries,
+                "entries",
+            )
+        )
+    return results
+
+
+def bench_startup() -> list[dict[str, Any]]:
+    """Benchmarks of starting scriv in a new process."""
+    results = []
+    for args in [["--help"], ["create", "--help"]]:
+        cmd = [sys.executable, "-m", "scriv", *args]
+        results.append(
+            measure(
+                f"startup, scriv {' '.join(args)}",
+                lambda cmd=cmd: subprocess.run(
+                    cmd, check=True, capture_output=True
+                ),
+                1,
+                "starts",
+                repeat=5,
+            )
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Use small sizes, for a smoke test.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["rst", "md"],
+        action="append",
+        help="Only benchmark this format (can be repeated).",
+    )
+    parser.add_argument(
+        "--output", help="Write the JSON results to this file, not stdout."
+    )
+    parser.add_argument(
+        "--max-startup",
+        type=float,
+        metavar="SECONDS",
+        help="Fail if starting `scriv --help` takes longer than this.",
+    )
+    args = parser.parse_args(argv)
+    logging.getLogger("scriv").setLevel(logging.WARNING)
+
+    sizes = QUICK_SIZES if args.quick else FULL_SIZES
+    results = bench_startup()
+    for fmt in args.format or ["rst", "md"]:
+        for count in sizes["fragments"]:
+            results.extend(bench_fragments(fmt, count))
+        for entries in sizes["entries"]:
+            results.extend(bench_changelog(fmt, entries))
+
+    report = {
+        "scriv_version": scriv.__version__,
+        "python": sys.version,
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "when": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "results": results,
+    }
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(report_json + "\n", encoding="utf-8")
+    else:
+        print(report_json)
+
+    startup = results[0]["seconds"]
+    if args.max_startup is not None and startup > args.max_startup:
+        sys.exit(
+            f"Starting `scriv --help` took {startup:.3f}s, "
+            + f"more than {args.max_startup}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
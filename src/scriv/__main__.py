@@ -2,4 +2,4 @@
 
 from .cli import cli
 
-cli(prog_name="scriv")
+cli(prog_name="scriv")  # pylint: disable=no-value-for-parameter
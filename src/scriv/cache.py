@@ -0,0 +1,134 @@
+"""A persistent on-disk cache of parsed sections."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from . import __version__
+from .config import Config
+from .format import SectionDict
+
+logger = logging.getLogger(__name__)
+
+
+class SectionCache:
+    """
+    A directory of parsed SectionDicts, and other cached data.
+
+    Each entry is stored in a JSON file with a `name`, along with a `key` that
+    identifies the text and settings it was parsed from.  An entry is only
+    returned if its key matches, so stale entries are simply ignored.
+
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        """Make a cache stored in `directory`."""
+        self.directory = Path(directory)
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """
+        Make a cache key from all of the strings that determine a parse.
+
+        The scriv version is included, so that a new scriv won't use results
+        from an old parser.
+        """
+        hasher = hashlib.sha256(__version__.encode("utf-8"))
+        for part in parts:
+            hasher.update(b"\0")
+            hasher.update(part.encode("utf-8", "surrogatepass"))
+        return hasher.hexdigest()
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def read_json(self, name: str) -> dict | None:
+        """Read the JSON data stored as `name`, or None if it can't be read."""
+        try:
+            with self._path(name).open(encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+        return data
+
+    def write_json(self, name: str, data: dict) -> None:
+        """
+        Store JSON `data` as `name`.
+
+        Failures to write are logged and ignored: the cache is only an
+        optimization.
+        """
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(
+                dir=self.directory, prefix=".tmp_", suffix=".json"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(temp_name, self._path(name))
+            except BaseException:
+                os.unlink(temp_name)
+                raise
+        except OSError as exc:
+            logger.debug(f"Couldn't write cache entry {name!r}: {exc}")
+
+    def get(self, name: str, key: str) -> SectionDict | None:
+        """
+        Get the cached sections stored as `name`.
+
+        Returns None if there's no entry, or if its key isn't `key`.
+        """
+        data = self.read_json(name)
+        if data is None or data.get("key") != key:
+            return None
+        logger.debug(f"Using cached sections {name!r}")
+        return dict(data["sections"])
+
+    def put(self, name: str, key: str, sections: SectionDict) -> None:
+        """
+        Store `sections` as `name`, identified by `key`.
+        """
+        self.write_json(name, {"key": key, "sections": list(sections.items())})
+
+    def get_table(self, name: str) -> dict[str, SectionDict]:
+        """
+        Get the table of sections stored as `name`.
+
+        A table holds many SectionDicts, each under its own key.  Returns an
+        empty table if there is none.
+        """
+        data = self.read_json(name)
+        if data is None or not isinstance(data.get("table"), dict):
+            return {}
+        return {key: dict(sections) for key, sections in data["table"].items()}
+
+    def put_table(self, name: str, table: dict[str, SectionDict]) -> None:
+        """
+        Store a `table` of SectionDicts as `name`.
+        """
+        self.write_json(
+            name,
+            {
+                "table": {
+                    key: list(sections.items())
+                    for key, sections in table.items()
+                }
+            },
+        )
+
+
+def section_cache(config: Config) -> SectionCache | None:
+    """
+    Get the SectionCache configured by `config`, or None if not caching.
+    """
+    if not config.cache_directory:
+        return None
+    return SectionCache(config.cache_directory)
@@ -2,17 +2,29 @@
 
 import datetime
 import logging
+import os
+import shutil
+import tempfile
+from collections import Counter
+from collections.abc import Iterator
 from pathlib import Path
 
 import attr
-import jinja2
 
+from .cache import section_cache
 from .config import Config
-from .format import FormatTools, SectionDict, get_format_tools
+from .format import FormatTools, Section, SectionDict, get_format_tools
+from .jinja import get_template
+from .timing import phase, timed_iter
 from .util import partition_lines
 
 logger = logging.getLogger(__name__)
 
+# The process's umask.  It can only be read by setting it, which would race
+# with other threads, so it's read once, at import.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 
 @attr.s
 class Fragment:
@@ -21,6 +33,8 @@ class Fragment:
     path = attr.ib(type=Path)
     format = attr.ib(type=str, default=None)
     content = attr.ib(type=str, default=None)
+    # The category for text not in a section, from the fragment's directory.
+    category = attr.ib(type=str | None, default=None)
 
     def __attrs_post_init__(
         self,
@@ -30,7 +44,8 @@ class Fragment:
 
     def write(self) -> None:
         """Write the content to the file."""
-        self.path.write_text(self.content)
+        with phase("write"):
+            self.path.write_text(self.content)
 
     def read(self) -> None:
         """Read the content of the fragment."""
@@ -52,40 +67,52 @@ class Changelog:
         """Read the changelog if it exists."""
         logger.info(f"Reading changelog {self.path}")
         if self.path.exists():
-            with self.path.open("r", encoding="utf-8") as f:
-                changelog_text = f.read()
-                if f.newlines:  # .newlines may be None, str, or tuple
-                    if isinstance(f.newlines, str):
-                        self.newline = f.newlines
-                    else:
-                        self.newline = f.newlines[0]
-            before, marker, after = partition_lines(
-                changelog_text, self.config.start_marker
-            )
-            if marker:
-                self.text_before = before + marker
-                rest = after
-            else:
-                self.text_before = ""
-                rest = before
-            self.changelog, marker, after = partition_lines(
-                rest, self.config.end_marker
-            )
-            self.text_after = marker + after
+            with phase("read"):
+                self._read()
         else:
             logger.warning(f"Changelog {self.path} doesn't exist")
 
+    def _read(self) -> None:
+        """Read the changelog, and find the markers in it."""
+        with self.path.open("r", encoding="utf-8") as f:
+            changelog_text = f.read()
+            if f.newlines:  # .newlines may be None, str, or tuple
+                if isinstance(f.newlines, str):
+                    self.newline = f.newlines
+                else:
+                    self.newline = f.newlines[0]
+        before, marker, after = partition_lines(
+            changelog_text, self.config.start_marker
+        )
+        if marker:
+            self.text_before = before + marker
+            rest = after
+        else:
+            self.text_before = ""
+            rest = before
+        self.changelog, marker, after = partition_lines(
+            rest, self.config.end_marker
+        )
+        self.text_after = marker + after
+
     def format_tools(self) -> FormatTools:
         """Get the appropriate FormatTools for this changelog."""
         return get_format_tools(self.config.format, self.config)
 
     def entry_header(self, version, date=None) -> str:
         """Format the header for a new entry."""
+        with phase("render"):
+            return self._entry_header(version, date)
+
+    def _entry_header(self, version, date) -> str:
+        """Do the work of entry_header."""
         title_data = {
             "date": date or datetime.datetime.now(),
             "version": version,
         }
-        title_template = jinja2.Template(self.config.entry_title_template)
+        title_template = get_template(
+            self.config, self.config.entry_title_template
+        )
         new_title = title_template.render(config=self.config, **title_data)
         if new_title.strip():
             anchor = f"changelog-{version}" if version else None
@@ -98,20 +125,115 @@ class Changelog:
 
     def entry_text(self, sections: SectionDict) -> str:
         """Format the text of a new entry."""
-        return self.format_tools().format_sections(sections)
+        with phase("render"):
+            return self.format_tools().format_sections(sections)
 
     def add_entry(self, header: str, text: str) -> None:
         """Add a new entry to the top of the changelog."""
         self.changelog = header + text + self.changelog
 
-    def write(self) -> None:
-        """Write the changelog."""
-        f = self.path.open("w", encoding="utf-8", newline=self.newline or None)
-        with f:
-            f.write(self.text_before)
-            f.write(self.changelog)
-            f.write(self.text_after)
+    def write(
+        self, header: str = "", sections: SectionDict | None = None
+    ) -> None:
+        """
+        Write the changelog.
+
+        If `sections` are given, they are written as a new entry at the top of
+        the changelog, after `header`.  The entry is rendered straight into the
+        file, rather than added to the text in memory: `self.changelog` isn't
+        changed.
+
+        The text is written to a temporary file alongside the changelog, which
+        then replaces it, so an interrupted write can't leave the changelog
+        truncated.
+        """
+        with phase("write"):
+            self._write(header, sections)
+
+    def _write(self, header: str, sections: SectionDict | None) -> None:
+        """Write the changelog through a temporary file."""
+        # Write through symlinks rather than replacing them.
+        path = Path(os.path.realpath(self.path))
+        fd, temp_name = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        try:
+            f = os.fdopen(
+                fd, "w", encoding="utf-8", newline=self.newline or None
+            )
+            with f:
+                f.write(self.text_before)
+                if sections is not None:
+                    f.write(header)
+                    with phase("render"):
+                        self.format_tools().write_sections(sections, f)
+                f.write(self.changelog)
+                f.write(self.text_after)
+                f.flush()
+                os.fsync(f.fileno())
+            if path.exists():
+                shutil.copymode(path, temp_name)
+            else:
+                os.chmod(temp_name, 0o666 & ~_UMASK)
+            os.replace(temp_name, path)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
 
     def entries(self) -> SectionDict:
-        """Parse the changelog into a SectionDict."""
-        return self.format_tools().parse_text(self.changelog)
+        """
+        Parse the changelog into a SectionDict.
+
+        If a cache directory is configured, the parsed entries are kept there,
+        and only re-parsed when the changelog text or parse settings change.
+        """
+        with phase("parse"):
+            cache = section_cache(self.config)
+            if cache is None:
+                return self.format_tools().parse_text(self.changelog)
+
+            name = f"changelog-{self.path.name}"
+            key = cache.key(
+                self.config.format, self.config.start_marker, self.changelog
+            )
+            entries = cache.get(name, key)
+            if entries is None:
+                entries = self.format_tools().parse_text(self.changelog)
+                cache.put(name, key, entries)
+            return entries
+
+    def iter_entries(self) -> Iterator[Section]:
+        """
+        Parse the changelog, producing (title, paragraphs) pairs.
+
+        Entries with the same title are merged into the first one, as they are
+        by `entries`.
+
+        Without a cache directory, the changelog is only parsed as far as the
+        caller reads, so finding a recent entry doesn't parse the whole file.
+        An entry whose title isn't on exactly one line of the text could have a
+        duplicate, so then the rest of the changelog is parsed to merge them.
+        """
+        if section_cache(self.config) is not None:
+            yield from self.entries().items()
+            return
+
+        # Header lines, without their markup.  Titles with leading markup or
+        # whitespace aren't counted, so they are never taken as unique.
+        lines = Counter(
+            line.strip().lstrip("#").strip()
+            for line in self.changelog.splitlines()
+        )
+        sections = timed_iter(
+            "parse", self.format_tools().iter_sections(self.changelog)
+        )
+        for title, paragraphs in sections:
+            if title is None or lines[title] == 1:
+                yield title, paragraphs
+                continue
+            # Earlier titles appear only once, so only the rest can repeat.
+            entries: SectionDict = {title: list(paragraphs)}
+            for later_title, later_paragraphs in sections:
+                entries.setdefault(later_title, []).extend(later_paragraphs)
+            yield from entries.items()
+            return
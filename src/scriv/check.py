@@ -0,0 +1,97 @@
+"""Checking fragments."""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import sys
+
+import click
+
+from .changelog import Fragment
+from .format import SectionDict
+from .gitinfo import git_changed_files
+from .scriv import Scriv
+from .util import scriv_command
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.option(
+    "--since",
+    default=None,
+    metavar="REF",
+    help="Only check fragments added or changed since this git commit.",
+)
+@scriv_command
+def check(
+    *,
+    since: str | None,
+    config_file: str | None,
+) -> None:
+    """
+    Check that fragments are ready to be collected.
+    """
+    scriv = Scriv(config_file=config_file)
+    frags = scriv.fragments_to_combine()
+    if since is not None:
+        changed = set(git_changed_files(since, scriv.config.fragment_directory))
+        frags = [frag for frag in frags if frag.path in changed]
+    if not frags:
+        logger.info("No changelog fragments to check")
+        return
+
+    workers = min(int(scriv.config.fragment_workers), len(frags))
+    # Resolve the settings used for checking before starting threads, so that
+    # each is only resolved once.
+    _ = scriv.config.start_marker, scriv.config.categories
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        all_problems = list(
+            executor.map(lambda frag: check_fragment(scriv, frag), frags)
+        )
+
+    num_problems = 0
+    for frag, problems in zip(frags, all_problems):
+        for problem in problems:
+            logger.error(f"{frag.path}: {problem}")
+            num_problems += 1
+    if num_problems:
+        sys.exit(
+            f"{num_problems} {'problem' if num_problems == 1 else 'problems'}"
+            + f" in {len(frags)} fragments"
+        )
+    logger.info(f"Checked {len(frags)} fragments")
+
+
+def check_fragment(scriv: Scriv, fragment: Fragment) -> list[str]:
+    """
+    Check one fragment, returning a list of its problems.
+    """
+    try:
+        sections = scriv.sections_from_fragment(fragment)
+    except (OSError, ValueError) as exc:
+        return [f"Couldn't read fragment: {exc}"]
+    return check_sections(scriv, sections)
+
+
+def check_sections(scriv: Scriv, sections: SectionDict) -> list[str]:
+    """
+    Check the sections read from a fragment, returning a list of problems.
+    """
+    problems = []
+    if not any(sections.values()):
+        problems.append("Fragment has no entries")
+    else:
+        for section, paragraphs in sections.items():
+            if section is not None and not paragraphs:
+                problems.append(f"Section {section!r} has no entries")
+    categories = scriv.config.categories
+    if categories:
+        for section in sections:
+            if section is not None and section not in categories:
+                problems.append(
+                    f"Unknown category {section!r}, "
+                    + f"should be one of: {', '.join(categories)}"
+                )
+    return problems
@@ -1,32 +1,156 @@
 """Scriv command-line interface."""
 
+import cProfile
+import importlib
 import logging
 
 import click
 import click_log
 
 from . import __version__
-from .collect import collect
-from .create import create
-from .ghrel import github_release
-from .print import print_
+from .timing import timer
 
 click_log.basic_config(logging.getLogger())
 
+# The subcommands: their names, the functions that implement them, and their
+# short help, so that listing them doesn't need to import them.
+SUBCOMMANDS = {
+    "check": (
+        "scriv.check:check",
+        "Check that fragments are ready to be collected.",
+    ),
+    "client": (
+        "scriv.client:client",
+        "Send a request to a running scriv server.",
+    ),
+    "collect": (
+        "scriv.collect:collect",
+        "Collect and combine fragments into the changelog.",
+    ),
+    "config": (
+        "scriv.show_config:show_config",
+        "Show the values of settings.",
+    ),
+    "create": (
+        "scriv.create:create",
+        "Create a new changelog fragment.",
+    ),
+    "github-release": (
+        "scriv.ghrel:github_release",
+        "Create GitHub releases from the changelog.",
+    ),
+    "print": (
+        "scriv.print:print_",
+        "Print collected fragments, or print entries from the changelog.",
+    ),
+    "serve": (
+        "scriv.serve:serve",
+        "Answer requests from scriv client, keeping data in memory.",
+    ),
+}
+
+
+class LazyGroup(click.Group):
+    """
+    A click Group that only imports a subcommand when it's used.
+
+    Importing all of the subcommands would import everything they need, like
+    requests and jinja2, which makes every command slow to start.
+    """
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        """List the names of the subcommands."""
+        return sorted(SUBCOMMANDS)
+
+    def get_command(
+        self, ctx: click.Context, cmd_name: str
+    ) -> click.Command | None:
+        """Import the subcommand named `cmd_name`."""
+        if cmd_name not in SUBCOMMANDS:
+            return None
+        module_name, _, func_name = SUBCOMMANDS[cmd_name][0].partition(":")
+        command = getattr(importlib.import_module(module_name), func_name)
+        assert isinstance(command, click.Command)
+        return command
+
+    def format_commands(
+        self, ctx: click.Context, formatter: click.HelpFormatter
+    ) -> None:
+        """Write the list of subcommands for --help, without importing them."""
+        # This is how click.Group shortens the help, done with stand-in
+        # commands that have the same help.
+        limit = formatter.width - 6 - max(len(name) for name in SUBCOMMANDS)
+        rows = [
+            (
+                name,
+                click.Command(name, help=short_help).get_short_help_str(limit),
+            )
+            for name, (_, short_help) in sorted(SUBCOMMANDS.items())
+        ]
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
 
 @click.group(
+    cls=LazyGroup,
     help=f"""\
         Manage changelogs.  https://scriv.readthedocs.io/
 
         Version {__version__}
-    """
+    """,
 )
 @click.version_option()
-def cli() -> None:  # noqa: D401
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report how long each phase of the command took.",
+)
+@click.option(
+    "--profile-file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write cProfile data for the command to this file.",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write an OTLP JSON trace of the commands run to this file.",
+)
+@click.pass_context
+def cli(
+    ctx: click.Context,
+    profile: bool,
+    profile_file: str | None,
+    trace: str | None,
+) -> None:  # noqa: D401
     """The main entry point for the scriv command."""
+    if profile or trace:
+        # pylint: disable=import-outside-toplevel
+        from .shell import recorder
+
+        recorder.enable()
+
+        @ctx.call_on_close
+        def stop_recording() -> None:
+            recorder.disable()
+            if trace:
+                recorder.write_trace(trace)
+
+    if profile:
+        timer.enable()
+
+        @ctx.call_on_close
+        def report_phases() -> None:
+            timer.disable()
+            click.echo(timer.report(), err=True)
+            click.echo(recorder.report(), err=True)
 
+    if profile_file:
+        profiler = cProfile.Profile()
+        profiler.enable()
 
-cli.add_command(create)
-cli.add_command(collect)
-cli.add_command(github_release)
-cli.add_command(print_)
+        @ctx.call_on_close
+        def dump_profile() -> None:
+            profiler.disable()
+            profiler.dump_stats(profile_file)
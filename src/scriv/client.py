@@ -0,0 +1,61 @@
+"""Sending requests to a scriv server."""
+
+from __future__ import annotations
+
+import json
+import socket
+import sys
+from typing import Any
+
+import click
+
+# These match scriv.serve, which isn't imported so that the client starts
+# quickly.
+DEFAULT_SOCKET = ".scriv.sock"
+REQUESTS = ["preview", "check", "print", "create"]
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    default=DEFAULT_SOCKET,
+    type=click.Path(dir_okay=False),
+    help=f"The Unix socket of the server, default {DEFAULT_SOCKET}.",
+)
+@click.argument("command", metavar="COMMAND", type=click.Choice(REQUESTS))
+@click.argument("version", required=False)
+def client(
+    *,
+    socket_path: str,
+    command: str,
+    version: str | None,
+) -> None:
+    """
+    Send a request to a running scriv server.
+
+    COMMAND is what to ask for: "preview" the fragments as a changelog entry,
+    "check" the fragments, "print" the changelog entry for VERSION, or
+    "create" a new fragment.
+    """
+    request: dict[str, Any] = {"command": command}
+    if version is not None:
+        request["version"] = version
+    try:
+        response = send_request(socket_path, request)
+    except (OSError, ValueError) as exc:
+        sys.exit(f"Couldn't get a response from {socket_path}: {exc}")
+    if not response["ok"]:
+        sys.exit(response["error"])
+    click.echo(response["output"], nl=False)
+
+
+def send_request(socket_path: str, request: dict[str, Any]) -> dict[str, Any]:
+    """Send `request` to the server at `socket_path`, and get its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as responses:
+            line = responses.readline()
+    response: dict[str, Any] = json.loads(line)
+    return response
@@ -5,7 +5,7 @@ import sys
 
 import click
 
-from .gitinfo import git_add, git_config_bool, git_edit, git_rm
+from .gitinfo import git_add, git_config_bool, git_edit, git_rm_files
 from .scriv import Scriv
 from .util import Version, scriv_command
 
@@ -67,7 +67,7 @@ def collect(
         version = Version(version or scriv.config.version)
         if version:
             # Check that we haven't used this version before.
-            for etitle in changelog.entries().keys():
+            for etitle, _ in changelog.iter_entries():
                 if etitle is None:
                     continue
                 eversion = Version.from_text(etitle)
@@ -86,9 +86,7 @@ def collect(
     else:
         new_header = changelog.format_tools().format_header(title)
 
-    new_text = changelog.entry_text(scriv.combine_fragments(frags))
-    changelog.add_entry(new_header, new_text)
-    changelog.write()
+    changelog.write(new_header, scriv.combine_fragments(frags))
 
     if edit:
         git_edit(changelog.path)
@@ -99,7 +97,7 @@ def collect(
     if not keep:
         for frag in frags:
             logger.info(f"Deleting fragment file {str(frag.path)!r}")
-            if add:
-                git_rm(frag.path)
-            else:
+            if not add:
                 frag.path.unlink()
+        if add:
+            git_rm_files(frag.path for frag in frags)
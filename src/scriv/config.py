@@ -2,20 +2,25 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import configparser
 import contextlib
 import logging
+import os
 import pkgutil
 import re
+import time
 from pathlib import Path
 from typing import Any
 
 import attr
 
+from . import __version__
 from .exceptions import ScrivException
 from .literals import find_literal
 from .optional import tomllib
 from .shell import run_shell_command
+from .timing import phase
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +43,27 @@ def subset_validator(allowed):
     return validate_subset
 
 
+def format_validator(_instance, attribute, value):
+    """
+    Validate that value is a known format.
+
+    Formats from other packages are only looked for if value isn't built in.
+    """
+    # pylint: disable=cyclic-import,import-outside-toplevel
+    from .format import BUILTIN_FORMATS, known_formats
+
+    if value in BUILTIN_FORMATS:
+        return
+    formats = known_formats()
+    if value not in formats:
+        raise ValueError(
+            f"{attribute.name!r} must be in {formats!r} (got {value!r})"
+        )
+
+
+# The prefixes of settings that get their value from elsewhere.
+EXTERNAL_PREFIXES = ("file:", "literal:", "command:")
+
 DEFAULT_FORMAT = "rst"
 DEFAULT_CHANGELOG = "CHANGELOG.${config:format}"
 
@@ -65,11 +91,12 @@ class _Options:
     format = attr.ib(  # type: ignore[assignment]
         type=str,
         default=None,
-        validator=attr.validators.optional(attr.validators.in_(["rst", "md"])),
+        validator=attr.validators.optional(format_validator),
         metadata={
             "doc": """\
                 The format to use for fragments and for the output changelog
-                file.  Can be either "rst" or "md".
+                file.  Can be either "rst" or "md", or a format added by
+                another installed package.
                 """,
             "doc_default": f"""\
                 Derived from the changelog file name if provided,
@@ -270,14 +297,45 @@ class _Options:
         },
     )
 
-    # Glob for files in the fragments directory that should not be collected.
+    # Globs for files in the fragments directory that should not be collected.
     skip_fragments = attr.ib(
+        type=list,
+        default=["README.*"],
+        metadata={
+            "doc": """\
+                Glob patterns for files in the fragment directory that should
+                not be collected.  Subdirectories matching these patterns are
+                also skipped.
+                """,
+        },
+    )
+
+    # Should fragments be found in subdirectories?
+    fragment_subdirectories = attr.ib(
+        type=bool,
+        default=False,
+        converter=attr.converters.to_bool,
+        metadata={
+            "doc": """\
+                If true, fragments are also collected from subdirectories of
+                the fragment directory.  A subdirectory named for a category
+                holds fragments for that category: text in them that isn't in
+                a category section is put in that category.
+                """,
+        },
+    )
+
+    # How many threads to use to read fragments.
+    fragment_workers = attr.ib(
         type=str,
-        default="README.*",
+        default="8",
+        validator=attr.validators.matches_re(r"[1-9][0-9]*"),
+        converter=attr.converters.optional(str),
         metadata={
             "doc": """\
-                A glob pattern for files in the fragment directory that should
-                not be collected.
+                A number: how many fragment files to read and parse at once.
+                Reading many fragments from a slow or network file system can
+                be faster with more.  Use 1 to read them one at a time.
                 """,
         },
     )
@@ -305,6 +363,68 @@ class _Options:
         },
     )
 
+    # Directory for caching parsed data between runs.
+    cache_directory = attr.ib(
+        type=str,
+        default="",
+        metadata={
+            "doc": """\
+                A directory where scriv can cache parsed changelog and
+                fragment data, and compiled templates, between runs, so that a
+                large changelog or unchanged fragments don't have to be
+                re-parsed each time.  The directory will be created if needed.
+                If empty, nothing is cached.
+                """,
+            "doc_default": "(empty)",
+        },
+    )
+
+    # Should file:, literal:, and command: settings be resolved up front?
+    resolve_eagerly = attr.ib(
+        type=bool,
+        default=False,
+        converter=attr.converters.to_bool,
+        metadata={
+            "doc": """\
+                If true, all of the settings that read files or run commands
+                are resolved at once when the configuration is read, rather
+                than one at a time as they are needed.  Commands then run in
+                parallel, and any problem with them is reported right away.
+                """,
+        },
+    )
+
+    # The longest a command: setting can run.
+    command_timeout = attr.ib(
+        type=str,
+        default="",
+        validator=attr.validators.matches_re(r"|[0-9]+(\.[0-9]*)?"),
+        converter=attr.converters.optional(str),
+        metadata={
+            "doc": """\
+                A number: the most seconds a command used for a setting can
+                run.  A command that takes longer is stopped, and the setting
+                can't be read.  If empty, commands can run as long as they
+                like.
+                """,
+            "doc_default": "(empty)",
+        },
+    )
+
+    # Settings whose command: values can be kept in the configuration cache.
+    cache_commands = attr.ib(
+        type=list,
+        default=[],
+        metadata={
+            "doc": """\
+                The names of settings whose ``command:`` values can be kept
+                in the configuration cache.  Other commands are run each time
+                scriv runs.  See :ref:`config_caching`.
+                """,
+            "doc_default": "(empty)",
+        },
+    )
+
     def post_create(self):
         """
         Reconcile some interdependent settings after creating the object.
@@ -355,6 +475,14 @@ class Config:
             self._options = _Options(**kwargs)
         if post_create_:
             self._options.post_create()
+        # How long it took to resolve the file:, literal:, and command:
+        # settings, in seconds, by setting name.
+        self.resolution_times: dict[str, float] = {}
+        # Where each setting came from, by setting name.  Settings that
+        # aren't here have their default value.
+        self.origins: dict[str, str] = {}
+        # The files read to get the settings, or looked for and not found.
+        self.sources: list[str] = []
 
     def __getattr__(self, name):
         """Proxy to self._options, and resolve the value."""
@@ -366,15 +494,54 @@ class Config:
         if attrdef.type is list:
             value = convert_list(value)
         elif isinstance(value, str):
-            try:
-                value = self.resolve_value(value)
-            except ScrivException as se:
-                raise ScrivException(
-                    f"Couldn't read {name!r} setting: {se}"
-                ) from se
+            value = self._resolve_setting(name, value)
         setattr(self, name, value)
         return value
 
+    def _resolve_setting(self, name: str, value: str) -> str:
+        """
+        Resolve the value of setting `name`, timing it if it's external.
+        """
+        external = value.startswith(EXTERNAL_PREFIXES)
+        start = time.perf_counter()
+        try:
+            with phase("config"):
+                value = self.resolve_value(value)
+        except ScrivException as se:
+            raise ScrivException(
+                f"Couldn't read {name!r} setting: {se}"
+            ) from se
+        if external:
+            self.resolution_times[name] = secs = time.perf_counter() - start
+            logger.debug(f"Resolved {name!r} setting in {secs:.3f}s")
+        return value
+
+    def resolve_all(self) -> None:
+        """
+        Resolve all of the file:, literal:, and command: settings now.
+
+        They are resolved in parallel, so slow commands run at the same time.
+        The first problem found is raised as a ScrivException.
+        """
+        names = [
+            attrdef.name
+            for attrdef in attr.fields(_Options)
+            if attrdef.name not in self.__dict__
+            and attrdef.type is not list
+            and isinstance(value := getattr(self._options, attrdef.name), str)
+            and value.startswith(EXTERNAL_PREFIXES)
+        ]
+        if not names:
+            return
+        # Resolve the settings used while resolving before starting threads.
+        _ = self.fragment_directory, self.command_timeout
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(names), thread_name_prefix="scriv-config"
+        ) as executor:
+            futures = [executor.submit(getattr, self, name) for name in names]
+        for future in futures:
+            future.result()
+
     @classmethod
     def read(cls, file_name: str | None = None) -> Config:
         """
@@ -386,25 +553,115 @@ class Config:
 
         The section can be named ``[scriv]`` or ``[tool.scriv]``.
 
+        If the SCRIV_CONFIG_CACHE environment variable names a directory, the
+        configuration is cached there, and used again until one of the files
+        it came from changes.
+
         """
-        config = cls(post_create_=False)
-        if file_name is not None:
-            config.read_one_config(file_name)
-        else:
-            config.read_one_config("setup.cfg")
-            config.read_one_config("tox.ini")
-            config.read_one_toml("pyproject.toml")
-            config.read_one_config(
-                str(Path(config.fragment_directory) / "scriv.ini")
+        cache_dir = os.environ.get("SCRIV_CONFIG_CACHE")
+        with phase("config"):
+            cached = (
+                cls._from_cache(cache_dir, file_name) if cache_dir else None
             )
-        with validator_exceptions():
-            attr.validate(config._options)
-        config._options.post_create()
+            if cached is not None:
+                config = cached
+            else:
+                config = cls(post_create_=False)
+                if file_name is not None:
+                    config.read_one_config(file_name)
+                else:
+                    config.read_one_config("setup.cfg")
+                    config.read_one_config("tox.ini")
+                    config.read_one_toml("pyproject.toml")
+                    config.read_one_config(
+                        str(Path(config.fragment_directory) / "scriv.ini")
+                    )
+                with validator_exceptions():
+                    attr.validate(config._options)
+                config._options.post_create()
+            # Settings that weren't cached, like most commands, are resolved
+            # even if the rest of the configuration came from the cache.
+            if config._options.resolve_eagerly:
+                config.resolve_all()
+            if cache_dir and cached is None:
+                config._to_cache(cache_dir, file_name)
         return config
 
-    def get_set_option(self, scriv_data, config_name, opt_name):
+    @classmethod
+    def _from_cache(
+        cls, cache_dir: str, file_name: str | None
+    ) -> Config | None:
+        """
+        Get the configuration cached in `cache_dir`, if it's still valid.
+        """
+        # pylint: disable=cyclic-import,import-outside-toplevel
+        from .cache import SectionCache
+
+        data = SectionCache(cache_dir).read_json("config")
+        if data is None or data.get("key") != _cache_key(file_name):
+            return None
+        if any(
+            file_signature(path) != signature
+            for path, signature in data["sources"]
+        ):
+            logger.debug("Cached configuration is out of date")
+            return None
+        logger.debug(f"Using cached configuration from {cache_dir}")
+        config = cls(post_create_=False)
+        for name, value in data["options"].items():
+            setattr(config._options, name, value)
+        for name, value in data["resolved"].items():
+            setattr(config, name, value)
+        config.origins = data["origins"]
+        config.sources = [path for path, _ in data["sources"]]
+        return config
+
+    def _to_cache(self, cache_dir: str, file_name: str | None) -> None:
+        """
+        Cache this configuration in `cache_dir`.
+
+        The file: and literal: settings are resolved and cached too, but
+        command: settings only if they are named in `cache_commands`.  Settings
+        that can't be resolved are left to fail when they are used.
+        """
+        # pylint: disable=cyclic-import,import-outside-toplevel
+        from .cache import SectionCache
+
+        cache_commands = set(self.cache_commands)
+        resolved = {}
+        for attrdef in attr.fields(_Options):
+            name = attrdef.name
+            value = getattr(self._options, name)
+            if (
+                attrdef.type is list
+                or not isinstance(value, str)
+                or not value.startswith(EXTERNAL_PREFIXES)
+                or (value.startswith("command:") and name not in cache_commands)
+            ):
+                continue
+            try:
+                resolved[name] = getattr(self, name)
+            except ScrivException:
+                continue
+        SectionCache(cache_dir).write_json(
+            "config",
+            {
+                "key": _cache_key(file_name),
+                "sources": [
+                    (path, file_signature(path))
+                    for path in dict.fromkeys(self.sources)
+                ],
+                "options": attr.asdict(self._options),
+                "resolved": resolved,
+                "origins": self.origins,
+            },
+        )
+
+    def get_set_option(self, scriv_data, config_name, opt_name, origin):
         """
         Set one option from a config file setting.
+
+        `origin` is the name of the file the setting is from.
         """
         try:
             val: Any = scriv_data[config_name]
@@ -415,12 +672,16 @@ class Config:
             if callable(attrdef.converter):
                 val = attrdef.converter(val)
             setattr(self._options, opt_name, val)
+            if config_name != opt_name:
+                origin += f" ({config_name})"
+            self.origins[opt_name] = origin
 
     def read_one_config(self, configfile: str) -> None:
         """
         Read one configuration file, adding values to `self`.
         """
         logger.debug(f"Looking for config file {configfile}")
+        self.sources.append(configfile)
         parser = configparser.ConfigParser()
         files_read = parser.read(configfile, encoding="utf-8")
         if not files_read:
@@ -439,15 +700,18 @@ class Config:
         if section_name:
             scriv_data = parser[section_name]
             for old, new in DEPRECATED_NAMES:
-                self.get_set_option(scriv_data, old, new)
+                self.get_set_option(scriv_data, old, new, configfile)
             for attrdef in attr.fields(_Options):
-                self.get_set_option(scriv_data, attrdef.name, attrdef.name)
+                self.get_set_option(
+                    scriv_data, attrdef.name, attrdef.name, configfile
+                )
 
     def read_one_toml(self, tomlfile: str) -> None:
         """
         Read one .toml file if it exists, adding values to `self`.
         """
         logger.debug(f"Looking for config file {tomlfile}")
+        self.sources.append(tomlfile)
         tomlpath = Path(tomlfile)
         if not tomlpath.exists():
             logger.debug(f"{tomlfile} doesn't exist")
@@ -455,6 +719,9 @@ class Config:
 
         toml_text = tomlpath.read_text(encoding="utf-8")
         logger.debug(f"{tomlfile} was read")
+        if "scriv" not in toml_text:
+            # No settings for us, don't bother parsing it.
+            return
 
         if tomllib is None:
             # Toml support isn't installed. Only print an exception if the
@@ -475,9 +742,11 @@ class Config:
                 # No settings for us
                 return
             for old, new in DEPRECATED_NAMES:
-                self.get_set_option(scriv_data, old, new)
+                self.get_set_option(scriv_data, old, new, tomlfile)
             for attrdef in attr.fields(_Options):
-                self.get_set_option(scriv_data, attrdef.name, attrdef.name)
+                self.get_set_option(
+                    scriv_data, attrdef.name, attrdef.name, tomlfile
+                )
 
     def resolve_value(self, value: str) -> str:
         """
@@ -508,6 +777,7 @@ class Config:
             literal_name = literal_name.strip()
             if not literal_name:
                 raise ScrivException(f"Missing value name: {value!r}")
+            self.sources.append(file_name)
             try:
                 found = find_literal(file_name, literal_name)
             except Exception as exc:
@@ -522,7 +792,10 @@ class Config:
             value = found
         elif value.startswith("command:"):
             cmd = value.partition(":")[2].strip()
-            ok, out = run_shell_command(cmd)
+            timeout = self.command_timeout
+            ok, out = run_shell_command(
+                cmd, timeout=float(timeout) if timeout else None
+            )
             if not ok:
                 raise ScrivException(f"Command {cmd!r} failed:\n{out}")
             if out.count("\n") == 1:
@@ -541,6 +814,7 @@ class Config:
         possibilities.append(Path(".") / file_name)
 
         for file_path in possibilities:
+            self.sources.append(str(file_path))
             if file_path.exists():
                 value = file_path.read_text()
                 break
@@ -560,6 +834,27 @@ class Config:
         return value
 
 
+def _cache_key(file_name: str | None) -> list[str | None]:
+    """
+    Identify a cached configuration: what was read, where, and by what scriv.
+    """
+    return [__version__, os.getcwd(), file_name]
+
+
+def file_signature(path: str) -> list[int] | None:
+    """
+    Get the modification time and size of a file, or None if it's missing.
+
+    It's a list rather than a tuple so that it's the same after a round trip
+    through JSON.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
 def convert_list(val: str | list[str]) -> list[str]:
     """
     Convert a string value from a config into a list of strings.
@@ -5,6 +5,8 @@ import sys
 
 import click
 
+from .changelog import Fragment
+from .exceptions import ScrivException
 from .gitinfo import git_add, git_config_bool, git_edit
 from .scriv import Scriv
 from .util import scriv_command
@@ -36,19 +38,8 @@ def create(
     if edit is None:
         edit = git_config_bool("scriv.create.edit")
     scriv = Scriv(config_file=config_file)
-    frag = scriv.new_fragment()
+    frag = create_fragment(scriv)
     file_path = frag.path
-    if not file_path.parent.exists():
-        sys.exit(
-            f"Output directory {str(file_path.parent)!r} doesn't exist,"
-            + " please create it."
-        )
-
-    if file_path.exists():
-        sys.exit(f"File {file_path} already exists, not overwriting")
-
-    logger.info(f"Creating {file_path}")
-    frag.write()
 
     if edit:
         git_edit(file_path)
@@ -60,3 +51,28 @@ def create(
 
     if add:
         git_add(file_path)
+
+
+def create_fragment(scriv: Scriv) -> Fragment:
+    """
+    Write a new fragment, and return it.
+
+    Raises ScrivException if the fragment directory doesn't exist, or if the
+    fragment's file already does.
+    """
+    frag = scriv.new_fragment()
+    file_path = frag.path
+    if not file_path.parent.exists():
+        raise ScrivException(
+            f"Output directory {str(file_path.parent)!r} doesn't exist,"
+            + " please create it."
+        )
+
+    if file_path.exists():
+        raise ScrivException(
+            f"File {file_path} already exists, not overwriting"
+        )
+
+    logger.info(f"Creating {file_path}")
+    frag.write()
+    return frag
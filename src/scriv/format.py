@@ -1,15 +1,32 @@
 """Dispatcher for format-based knowledge."""
 
 import abc
-from typing import Optional
+import functools
+import importlib
+import importlib.metadata
+import threading
+import weakref
+from collections.abc import Iterator
+from typing import Optional, TextIO
 
 from .config import Config
+from .exceptions import ScrivException
 
 # When collecting changelog fragments, we group them by their category into
 # Sections.  A SectionDict maps category names to a list of the paragraphs in
 # that section.  For projects not using categories, the key will be None.
 SectionDict = dict[Optional[str], list[str]]
 
+# One section: its header, and the list of its paragraphs.
+Section = tuple[Optional[str], list[str]]
+
+
+def trim_paragraphs(paragraphs: list[str]) -> list[str]:
+    """
+    Remove empty paragraphs, and trailing whitespace from the others.
+    """
+    return [par.rstrip() for par in paragraphs if par]
+
 
 class FormatTools(abc.ABC):
     """Methods and data about specific formats."""
@@ -18,7 +35,6 @@ class FormatTools(abc.ABC):
         """Create a FormatTools with the specified configuration."""
         self.config = config or Config()
 
-    @abc.abstractmethod
     def parse_text(self, text: str) -> SectionDict:
         """
         Parse text to find sections.
@@ -30,6 +46,26 @@ class FormatTools(abc.ABC):
             A dict mapping section headers to a list of the paragraphs in each
             section.
         """
+        sections: SectionDict = {}
+        for section, paragraphs in self.iter_sections(text):
+            sections.setdefault(section, []).extend(paragraphs)
+        return sections
+
+    @abc.abstractmethod
+    def iter_sections(self, text: str) -> Iterator[Section]:
+        """
+        Parse text to find sections, producing them one at a time.
+
+        Each section is produced as soon as the parser reaches its end, so
+        callers that stop early don't pay to parse the rest of the text.
+        A header that appears more than once produces more than one section.
+
+        Args:
+            text: the marked-up text.
+
+        Returns:
+            An iterator of (header, paragraphs) pairs.
+        """
 
     @abc.abstractmethod
     def format_header(self, text: str, anchor: str | None = None) -> str:
@@ -37,11 +73,33 @@ class FormatTools(abc.ABC):
         Format the header for a new changelog entry.
         """
 
-    @abc.abstractmethod
     def format_sections(self, sections: SectionDict) -> str:
         """
         Format a series of sections into marked-up text.
         """
+        return "\n".join(self.iter_section_lines(sections))
+
+    def write_sections(self, sections: SectionDict, outfile: TextIO) -> None:
+        """
+        Write a series of sections as marked-up text to a text stream.
+
+        The text is the same as `format_sections` returns, but is written as
+        it's produced rather than built in memory first.
+        """
+        sep = ""
+        for line in self.iter_section_lines(sections):
+            outfile.write(sep)
+            outfile.write(line)
+            sep = "\n"
+
+    @abc.abstractmethod
+    def iter_section_lines(self, sections: SectionDict) -> Iterator[str]:
+        """
+        Format a series of sections into marked-up text, one line at a time.
+
+        Joined with newlines, the lines are the text of the sections.  A
+        paragraph is produced as one "line", though it may have newlines in it.
+        """
 
     @abc.abstractmethod
     def convert_to_markdown(
@@ -52,25 +110,80 @@ class FormatTools(abc.ABC):
         """
 
 
+# The formats built into scriv, and the classes that implement them.
+BUILTIN_FORMATS = {
+    "rst": "scriv.format_rst:RstTools",
+    "md": "scriv.format_md:MdTools",
+}
+
+# The entry point group other packages can use to add formats.  The name of
+# the entry point is the format name, and it refers to a FormatTools subclass.
+ENTRY_POINT_GROUP = "scriv.formats"
+
+
+@functools.cache
+def _plugin_formats() -> dict[str, importlib.metadata.EntryPoint]:
+    """Find the formats provided by other packages."""
+    return {
+        ep.name: ep
+        for ep in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP)
+        if ep.name not in BUILTIN_FORMATS
+    }
+
+
+def known_formats() -> list[str]:
+    """
+    Get the names of all the formats scriv can use.
+
+    Other packages are only looked for the first time this is called.
+    """
+    return list(BUILTIN_FORMATS) + sorted(_plugin_formats())
+
+
+@functools.cache
+def _format_class(fmt: str) -> type[FormatTools]:
+    """Import and return the FormatTools class for format `fmt`."""
+    if fmt in BUILTIN_FORMATS:
+        module_name, _, class_name = BUILTIN_FORMATS[fmt].partition(":")
+        tools_class = getattr(importlib.import_module(module_name), class_name)
+    else:
+        try:
+            entry_point = _plugin_formats()[fmt]
+        except KeyError:
+            raise ScrivException(f"Unknown format: {fmt!r}") from None
+        tools_class = entry_point.load()
+        if not (
+            isinstance(tools_class, type)
+            and issubclass(tools_class, FormatTools)
+        ):
+            raise ScrivException(
+                f"Format {fmt!r} from {entry_point.value!r} isn't a FormatTools"
+            )
+    return tools_class  # type: ignore[no-any-return]
+
+
+# The FormatTools made for each Config, so each is only made once.
+_format_tools: weakref.WeakKeyDictionary[Config, dict[str, FormatTools]] = (
+    weakref.WeakKeyDictionary()
+)
+_format_tools_lock = threading.Lock()
+
+
 def get_format_tools(fmt: str, config: Config) -> FormatTools:
     """
     Return the FormatTools to use.
 
+    The same FormatTools object is returned each time for the same format and
+    configuration.
+
     Args:
-        fmt: One of the supported formats ("rst" or "md").
+        fmt: One of the formats in `known_formats()`, like "rst" or "md".
         config: The configuration settings to use.
 
     """
-    if fmt == "rst":
-        from . import (  # pylint: disable=cyclic-import,import-outside-toplevel
-            format_rst,
-        )
-
-        return format_rst.RstTools(config)
-    else:
-        assert fmt == "md"
-        from . import (  # pylint: disable=cyclic-import,import-outside-toplevel
-            format_md,
-        )
-
-        return format_md.MdTools(config)
+    with _format_tools_lock:
+        tools_for_config = _format_tools.setdefault(config, {})
+        tools = tools_for_config.get(fmt)
+        if tools is None:
+            tools = tools_for_config[fmt] = _format_class(fmt)(config)
+    return tools
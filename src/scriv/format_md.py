@@ -1,17 +1,36 @@
 """Markdown text knowledge for scriv."""
 
+import functools
 import re
+from collections.abc import Iterator
 
-from .format import FormatTools, SectionDict
+from .format import FormatTools, Section, SectionDict, trim_paragraphs
+
+# The kinds of lines the parser cares about, classified with one match.  The
+# alternatives are tried in order, so a one-line comment is found before the
+# start of a multi-line comment.
+LINE_KIND_REGEX = re.compile(
+    r"""(?x)
+    (?P<comment>\s*<!--.*-->$)
+    | (?P<anchor><a\ id=(?P<quote>['"])[-.\w]+(?P=quote)></a>$)
+    | (?P<comment_start>\s*<!--)
+    | (?P<header>\#+\ )
+    """
+)
 
 
 class MdTools(FormatTools):
     """Specifics about how to work with Markdown."""
 
-    def parse_text(
+    @functools.cached_property
+    def header_level(self) -> int:
+        """The heading level for changelog entries."""
+        return int(self.config.md_header_level)
+
+    def iter_sections(
         self,
-        text,
-    ) -> SectionDict:  # noqa: D102 (inherited docstring)
+        text: str,
+    ) -> Iterator[Section]:  # noqa: D102 (inherited docstring)
         lines = text.splitlines()
 
         # If there's an insert marker, start there.
@@ -20,52 +39,47 @@ class MdTools(FormatTools):
                 lines = lines[lineno + 1 :]
                 break
 
-        sections: SectionDict = {}
         in_comment = False
+        section_title: str | None = None
         paragraphs = None
         section_mark = None
 
         for line in lines:
             line = line.rstrip()
             if in_comment:
-                if re.search(r"-->$", line):
+                if line.endswith("-->"):
                     in_comment = False
-            else:
-                if re.search(r"^\s*<!--.*-->$", line):
-                    # A one-line comment, skip it.
-                    continue
-                if re.search(r"""^<a id=(['"])[-.\w]+\1></a>$""", line):
-                    # An anchor, we don't need those.
-                    continue
-                if re.search(r"^\s*<!--", line):
-                    in_comment = True
-                    continue
-                if re.search(r"^#+ ", line):
-                    if section_mark is None or line.startswith(section_mark):
-                        section_title = line.split(maxsplit=1)[1]
-                        paragraphs = sections.setdefault(section_title, [])
-                        paragraphs.append("")
-                        section_mark = line.partition(" ")[0] + " "
-                        continue
-
-                if not line:
+                continue
+
+            m = LINE_KIND_REGEX.match(line)
+            kind = m.lastgroup if m else None
+            if kind in ("comment", "anchor"):
+                # A one-line comment, or an anchor: we don't need those.
+                continue
+            if kind == "comment_start":
+                in_comment = True
+                continue
+            if kind == "header":
+                if section_mark is None or line.startswith(section_mark):
                     if paragraphs is not None:
-                        paragraphs.append("")
+                        yield section_title, trim_paragraphs(paragraphs)
+                    section_title = line.split(maxsplit=1)[1]
+                    paragraphs = [""]
+                    section_mark = line.partition(" ")[0] + " "
                     continue
 
-                if paragraphs is None:
-                    paragraphs = sections.setdefault(None, [])
+            if not line:
+                if paragraphs is not None:
                     paragraphs.append("")
+                continue
+
+            if paragraphs is None:
+                paragraphs = [""]
 
-                paragraphs[-1] += line + "\n"
+            paragraphs[-1] += line + "\n"
 
-        # Trim out all empty paragraphs.
-        sections = {
-            section: [par.rstrip() for par in paragraphs if par]
-            for section, paragraphs in sections.items()
-            if paragraphs
-        }
-        return sections
+        if paragraphs is not None:
+            yield section_title, trim_paragraphs(paragraphs)
 
     def format_header(
         self,
@@ -79,32 +93,37 @@ class MdTools(FormatTools):
             header += text + "\n"
             header += self.config.md_setext_chars[0] * len(text) + "\n"
         else:
-            num = int(self.config.md_header_level)
+            num = self.header_level
             header += "#" * num + " " + text + "\n"
         return header
 
-    def format_sections(
+    def iter_section_lines(
         self,
         sections: SectionDict,
-    ) -> str:  # noqa: D102 (inherited docstring)
-        lines = [""]
+    ) -> Iterator[str]:  # noqa: D102 (inherited docstring)
+        compact = self.config.compact_fragments
+        setext_chars = self.config.md_setext_chars
+        header_level = self.header_level + 1
+        yield ""
+        last = ""
         for section, paragraphs in sections.items():
             if section:
-                if self.config.md_setext_chars:
-                    lines.append(section)
-                    lines.append(self.config.md_setext_chars[1] * len(section))
+                if setext_chars:
+                    yield section
+                    yield setext_chars[1] * len(section)
                 else:
-                    header_level = int(self.config.md_header_level) + 1
-                    lines.append("#" * header_level + " " + section)
-                lines.append("")
+                    yield "#" * header_level + " " + section
+                yield ""
+                last = ""
             for paragraph in paragraphs:
-                lines.append(paragraph)
-                if not self.config.compact_fragments:
-                    lines.append("")
-            if self.config.compact_fragments and lines[-1] != "":
-                lines.append("")
-
-        return "\n".join(lines)
+                yield paragraph
+                last = paragraph
+                if not compact:
+                    yield ""
+                    last = ""
+            if compact and last != "":
+                yield ""
+                last = ""
 
     def convert_to_markdown(
         self, text: str, name: str = "", fail_if_warn: bool = False
@@ -3,57 +3,42 @@
 import os
 import re
 import tempfile
+from collections.abc import Iterator
 
 from .exceptions import ScrivException
-from .format import FormatTools, SectionDict
+from .format import FormatTools, Section, SectionDict, trim_paragraphs
 from .shell import run_command
 
+# The characters that can be used to underline headings.
+HEADER_CHARS = "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"
+
+# The kinds of lines the parser cares about, classified with one match.
+#
+# RST syntax is subtle, so a comment is a dot-dot line that isn't one of the
+# other kinds of dot-dot lines: an underline, hyperlink, citation,
+# substitution, or directive.
+#
+# An underline is at least three of the same heading character.
+LINE_KIND_REGEX = re.compile(
+    r"""(?x)
+    (?P<comment>\.\.(?!\.|\ [_[|]|\ [\w_+:.-]+::))
+    | (?P<anchor>\.\.\ _[-.\w]+:$)
+    | (?P<underline>(?P<char>["""
+    + re.escape(HEADER_CHARS)
+    + r"""])(?P=char){2,}$)
+    """
+)
+
 
 class RstTools(FormatTools):
     """Specifics about how to work with reStructuredText."""
 
-    HEADER_CHARS = "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"
-
-    def _is_underline(self, line: str) -> bool:
-        """
-        Determine if `line` is a valid RST underline.
-        """
-        return (
-            len(line) >= 3
-            and line[0] in self.HEADER_CHARS
-            and len(set(line)) == 1
-        )
+    HEADER_CHARS = HEADER_CHARS
 
-    def _is_comment(self, line: str) -> bool:
-        """
-        Determine if a line is a comment.
-
-        RST syntax is subtle, so we have to check for other kinds of dot-dot
-        lines that are not comments.
-        """
-        if line.startswith(".."):
-            if line.startswith(("...", ".. _", ".. [", ".. |")):
-                # It's an underline, hyperlink, citation, or substitution, so
-                # not a comment.
-                return False
-            elif re.search(r"^.. [\w_+:.-]+::", line):
-                # A directive: not a comment.
-                return False
-            else:
-                return True
-        else:
-            return False
-
-    def _is_anchor(self, line: str) -> bool:
-        """
-        Determine if a line is an anchor.
-        """
-        return bool(re.search(r"^.. _[-.\w]+:$", line))
-
-    def parse_text(
+    def iter_sections(
         self,
         text: str,
-    ) -> SectionDict:  # noqa: D102 (inherited docstring)
+    ) -> Iterator[Section]:  # noqa: D102 (inherited docstring)
         # Parse a very restricted subset of rst.
         lines = text.splitlines()
 
@@ -64,57 +49,52 @@ class RstTools(FormatTools):
                 break
         lines.append("")
 
-        sections: SectionDict = {}
+        section_title: str | None = None
         prev_line = ""
-        paragraphs = None
+        paragraphs: list[str] = []
         section_char = None
 
         for line in lines:
             line = line.rstrip()
 
-            if self._is_comment(line):
-                # Comment, do nothing.
-                continue
-
-            if self._is_anchor(line):
+            m = LINE_KIND_REGEX.match(line)
+            kind = m.lastgroup if m else None
+            if kind in ("comment", "anchor"):
+                # Comments and anchors, do nothing.
                 continue
 
-            if self._is_underline(line):
+            if kind == "underline":
                 if section_char is None or line[0] == section_char:
                     # Section underline. Previous line was the heading.
                     # General RST can have overlines as well as underlines,
                     # which we detect because there are no previous paragraphs.
-                    if paragraphs is None or paragraphs[-1] == "":
+                    if not paragraphs or paragraphs[-1] == "":
                         continue
                     # Heading was made a paragraph, undo that.
                     assert paragraphs[-1] == prev_line + "\n"
                     paragraphs.pop()
-                    paragraphs = sections.setdefault(prev_line, [])
-                    paragraphs.append("")
+                    if paragraphs:
+                        yield section_title, trim_paragraphs(paragraphs)
+                    section_title = prev_line
+                    paragraphs = [""]
                     section_char = line[0]
                     continue
 
             if not line:
                 # A blank, start a new paragraph.
-                if paragraphs is not None:
+                if paragraphs:
                     paragraphs.append("")
                 continue
 
-            if paragraphs is None:
-                paragraphs = sections.setdefault(None, [])
-                paragraphs.append("")
+            if not paragraphs:
+                paragraphs = [""]
 
             paragraphs[-1] += line + "\n"
 
             prev_line = line
 
-        # Trim out all empty paragraphs.
-        sections = {
-            section: [par.rstrip() for par in paragraphs if par]
-            for section, paragraphs in sections.items()
-            if paragraphs
-        }
-        return sections
+        if paragraphs:
+            yield section_title, trim_paragraphs(paragraphs)
 
     def format_header(
         self,
@@ -129,24 +109,29 @@ class RstTools(FormatTools):
         )
         return header  # type: ignore[no-any-return]
 
-    def format_sections(
+    def iter_section_lines(
         self,
         sections: SectionDict,
-    ) -> str:  # noqa: D102 (inherited docstring)
-        lines = [""]
+    ) -> Iterator[str]:  # noqa: D102 (inherited docstring)
+        compact = self.config.compact_fragments
+        underline = self.config.rst_header_chars[1]
+        yield ""
+        last = ""
         for section, paragraphs in sections.items():
             if section:
-                lines.append(section)
-                lines.append(self.config.rst_header_chars[1] * len(section))
-                lines.append("")
+                yield section
+                yield underline * len(section)
+                yield ""
+                last = ""
             for paragraph in paragraphs:
-                lines.append(paragraph)
-                if not self.config.compact_fragments:
-                    lines.append("")
-            if self.config.compact_fragments and lines[-1] != "":
-                lines.append("")
-
-        return "\n".join(lines)
+                yield paragraph
+                last = paragraph
+                if not compact:
+                    yield ""
+                    last = ""
+            if compact and last != "":
+                yield ""
+                last = ""
 
     def convert_to_markdown(
         self, text: str, name: str = "", fail_if_warn: bool = False
@@ -4,14 +4,15 @@ import logging
 import re
 
 import click
-import jinja2
 
 from .exceptions import ScrivException
 from .github import create_release, get_releases, update_release
 from .gitinfo import get_github_repos
+from .jinja import get_template
 from .linkcheck import check_markdown_links
 from .scriv import Scriv
 from .shell import run_simple_command
+from .timing import phase
 from .util import Version, scriv_command
 
 logger = logging.getLogger(__name__)
@@ -67,14 +68,16 @@ def github_release(
     """
     repo = resolve_repo(repo)
 
-    tags = set(map(Version, run_simple_command("git tag").split()))
-    releases = {Version(k): v for k, v in get_releases(repo).items()}
+    with phase("vcs"):
+        tags = set(map(Version, run_simple_command("git tag").split()))
+    with phase("network"):
+        releases = {Version(k): v for k, v in get_releases(repo).items()}
 
     scriv = Scriv(config_file=config_file)
     changelog = scriv.changelog()
     changelog.read()
 
-    for title, sections in changelog.entries().items():
+    for title, sections in changelog.iter_entries():
         if title is None:
             continue
         version = Version.from_text(title)
@@ -89,9 +92,10 @@ def github_release(
             continue
 
         section_text = "\n\n".join(sections)
-        md = changelog.format_tools().convert_to_markdown(
-            section_text, name=title, fail_if_warn=fail_if_warn
-        )
+        with phase("render"):
+            md = changelog.format_tools().convert_to_markdown(
+                section_text, name=title, fail_if_warn=fail_if_warn
+            )
 
         release_data = {
             "body": md,
@@ -101,18 +105,22 @@ def github_release(
             "prerelease": version.is_prerelease(),
         }
 
-        ghrel_template = jinja2.Template(scriv.config.ghrel_template)
-        md = ghrel_template.render(
-            body=md,
-            version=version,
-            title=title,
-            release=release_data,
-            config=scriv.config,
-        )
+        with phase("render"):
+            ghrel_template = get_template(
+                scriv.config, scriv.config.ghrel_template
+            )
+            md = ghrel_template.render(
+                body=md,
+                version=version,
+                title=title,
+                release=release_data,
+                config=scriv.config,
+            )
         release_data["body"] = md
 
         if check_links:
-            check_markdown_links(md)
+            with phase("network"):
+                check_markdown_links(md)
 
         if version in releases:
             release = releases[version]
@@ -125,14 +133,16 @@ def github_release(
                     logger.debug(f"Old body:\n{release['body']}")
                     logger.debug(f"New body:\n{md}")
                 else:
-                    update_release(release, release_data)
+                    with phase("network"):
+                        update_release(release, release_data)
         else:
             logger.debug(f"Creating release, data = {release_data}")
             if dry_run:
                 logger.info(f"Would create release {version}")
                 logger.debug(f"Body:\n{md}")
             else:
-                create_release(repo, release_data)
+                with phase("network"):
+                    create_release(repo, release_data)
 
         if not all_entries:
             break
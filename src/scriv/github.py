@@ -5,8 +5,6 @@ import os
 from collections.abc import Iterable
 from typing import Any
 
-import requests
-
 logger = logging.getLogger(__name__)
 
 
@@ -42,6 +40,8 @@ def github_paginated(url: str) -> Iterable[dict[str, Any]]:
     """
     Get all the results from a paginated GitHub url.
     """
+    import requests  # pylint: disable=import-outside-toplevel
+
     while True:
         resp = requests.get(url, headers=auth_headers(), timeout=TIMEOUT)
         check_ok(resp)
@@ -81,6 +81,8 @@ def create_release(repo: str, release_data: dict[str, Any]) -> None:
                 draft: a boolean
                 prerelease: a boolean
     """
+    import requests  # pylint: disable=import-outside-toplevel
+
     logger.info(f"Creating release {release_data['name']}")
     url = RELEASES_URL.format(repo=repo)
     resp = requests.post(
@@ -100,6 +102,8 @@ def update_release(
         release_data: a dict with the data we want to update.
             See create_release for the accepted keys.
     """
+    import requests  # pylint: disable=import-outside-toplevel
+
     logger.info(f"Updating release {release_data['name']}")
     resp = requests.patch(
         release["url"],
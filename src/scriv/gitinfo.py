@@ -1,15 +1,20 @@
 """Get information from git."""
 
+from __future__ import annotations
+
+import functools
 import logging
 import os
 import re
-import subprocess
 import sys
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
 import click
 
-from .shell import run_simple_command
+from .exceptions import ScrivException
+from .shell import call_command, run_command, run_simple_command
+from .timing import phase
 
 logger = logging.getLogger(__name__)
 
@@ -38,14 +43,70 @@ def current_branch_name() -> str:
     """
     Get the current branch name.
     """
-    return run_simple_command("git rev-parse --abbrev-ref HEAD")
+    with phase("vcs"):
+        return run_simple_command("git rev-parse --abbrev-ref HEAD")
+
+
+# The git settings that scriv uses, which are read all at once by GitInfo:
+# names that are exactly these, or that start with these followed by a dot.
+GIT_INFO_SETTINGS = ("scriv", "github.user", "user.email")
+
+
+def _in_git_info(name: str) -> bool:
+    """Check whether `name` is one of the settings in GitInfo."""
+    return any(
+        name == setting or name.startswith(setting + ".")
+        for setting in GIT_INFO_SETTINGS
+    )
+
+
+class GitInfo:
+    """
+    A snapshot of the git settings that scriv uses.
+
+    The settings are read with one ``git config --list`` command, rather than
+    one command for each setting.  Names are lowercased, since git's setting
+    names aren't case-sensitive.
+    """
+
+    def __init__(self, config: dict[str, str]):
+        """Make a GitInfo with the settings in `config`."""
+        self.config = config
+
+    @classmethod
+    def read(cls) -> GitInfo:
+        """Read the settings from git."""
+        with phase("vcs"):
+            ok, out = run_command(["git", "config", "--list", "-z"])
+        config = {}
+        if ok:
+            # Each setting is "name\nvalue\0", or "name\0" for a setting
+            # with no value, which git takes as true.
+            for entry in out.split("\0"):
+                name, newline, value = entry.partition("\n")
+                name = name.lower()
+                if name and _in_git_info(name):
+                    config[name] = value if newline else "true"
+        return cls(config)
+
+
+@functools.cache
+def git_info() -> GitInfo:
+    """
+    Get the GitInfo for this process, reading it the first time.
+    """
+    return GitInfo.read()
 
 
 def git_config(option: str) -> str:
     """
-    Return a git config value.
+    Return a git config value, or "" if it isn't set.
     """
-    return run_simple_command(f"git config --get {option}")
+    name = option.lower()
+    if _in_git_info(name):
+        return git_info().config.get(name, "")
+    with phase("vcs"):
+        return run_simple_command(f"git config --get {option}")
 
 
 def git_config_bool(option: str) -> bool:
@@ -57,28 +118,116 @@ def git_config_bool(option: str) -> bool:
 
 def git_edit(filename: Path) -> None:
     """Edit a file using the same editor Git chooses."""
-    git_editor = run_simple_command("git var GIT_EDITOR")
+    with phase("vcs"):
+        git_editor = run_simple_command("git var GIT_EDITOR")
     click.edit(filename=str(filename), editor=git_editor)
 
 
 def git_add(filename: Path) -> None:
     """Git add a file. If it fails, sys.exit."""
-    ret = subprocess.call(["git", "add", str(filename)])
-    if ret == 0:
-        logger.info(f"Added {filename}")
-    else:
-        logger.error(f"Couldn't add {filename}")
-        sys.exit(ret)
+    git_add_files([filename])
 
 
 def git_rm(filename: Path) -> None:
     """Git rm a file. If it fails, sys.exit."""
-    ret = subprocess.call(["git", "rm", str(filename)])
-    if ret == 0:
-        logger.info(f"Removed {filename}")
-    else:
-        logger.error(f"Couldn't remove {filename}")
-        sys.exit(ret)
+    git_rm_files([filename])
+
+
+def git_add_files(filenames: Iterable[Path]) -> None:
+    """Git add files, in as few commands as possible. If any fail, sys.exit."""
+    _git_files("add", filenames, "Added", "add")
+
+
+def git_rm_files(filenames: Iterable[Path]) -> None:
+    """Git rm files, in as few commands as possible. If any fail, sys.exit."""
+    _git_files("rm", filenames, "Removed", "remove")
+
+
+# The longest command line to make when running git on many files.  Windows
+# limits command lines to 32767 characters, and that's less than the limit on
+# other systems.
+MAX_COMMAND_LENGTH = 30_000
+
+
+def _git_files(
+    command: str, filenames: Iterable[Path], done: str, verb: str
+) -> None:
+    """
+    Run a git command on many files, in batches.
+
+    The files are given to git in as few commands as fit in the command line
+    limit.  If a batch fails, its files are tried one at a time to find the
+    ones that failed, so that the others still get done.  When all the files
+    have been tried, if any failed, sys.exit.
+
+    """
+    failed = 0
+    for batch in _batches([str(f) for f in filenames], len(command) + 4):
+        with phase("vcs"):
+            ret = call_command(["git", command, *batch])
+        if ret == 0:
+            for filename in batch:
+                logger.info(f"{done} {filename}")
+            continue
+        if len(batch) > 1:
+            logger.debug(f"git {command} failed, trying files one at a time")
+            for filename in batch:
+                with phase("vcs"):
+                    ret = call_command(["git", command, filename])
+                if ret == 0:
+                    logger.info(f"{done} {filename}")
+                else:
+                    logger.error(f"Couldn't {verb} {filename}")
+                    failed = ret
+        else:
+            logger.error(f"Couldn't {verb} {batch[0]}")
+            failed = ret
+    if failed:
+        sys.exit(failed)
+
+
+def _batches(args: list[str], used: int) -> Iterator[list[str]]:
+    """
+    Split `args` into lists that fit on a command line.
+
+    `used` is the length of the command line without any of `args`.
+    """
+    batch: list[str] = []
+    length = used
+    for arg in args:
+        if batch and length + len(arg) + 1 > MAX_COMMAND_LENGTH:
+            yield batch
+            batch = []
+            length = used
+        batch.append(arg)
+        length += len(arg) + 1
+    if batch:
+        yield batch
+
+
+def git_changed_files(since: str, directory: str) -> list[Path]:
+    """
+    Get the files in `directory` added or changed since commit `since`.
+
+    Changes in the working tree are included, but untracked files are not.
+    The paths are relative to the current directory.
+    """
+    with phase("vcs"):
+        ok, out = run_command(
+            [
+                "git",
+                "diff",
+                "--name-only",
+                "--relative",
+                "--diff-filter=d",
+                since,
+                "--",
+                directory,
+            ]
+        )
+    if not ok:
+        raise ScrivException(f"Couldn't get changes since {since!r}: {out}")
+    return [Path(line) for line in out.splitlines() if line]
 
 
 def get_github_repos() -> set[str]:
@@ -87,7 +236,8 @@ def get_github_repos() -> set[str]:
 
     Returns a set of "name/repo" addresses for GitHub repos.
     """
-    urls = run_simple_command("git remote -v").splitlines()
+    with phase("vcs"):
+        urls = run_simple_command("git remote -v").splitlines()
     github_repos = set()
     for url in urls:
         m = re.search(r"github.com[:/]([^/]+/\S+)", url)
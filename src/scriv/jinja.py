@@ -0,0 +1,66 @@
+"""The Jinja environment for scriv's templates."""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+from typing import TYPE_CHECKING
+
+from .config import Config
+
+if TYPE_CHECKING:
+    import jinja2
+
+logger = logging.getLogger(__name__)
+
+
+def get_template(
+    config: Config, source: str, *, keep_trailing_newline: bool = False
+) -> jinja2.Template:
+    """
+    Get a compiled template for the template text `source`.
+
+    Each template is only compiled once, and if a cache directory is
+    configured, the compiled code is kept there for later runs.
+    """
+    env = _environment(
+        os.path.abspath(config.cache_directory)
+        if config.cache_directory
+        else "",
+        keep_trailing_newline,
+    )
+    return env.get_template(source)
+
+
+def _template_source(source: str) -> str:
+    """Get a template's source from its name, which is the source."""
+    return source
+
+
+@functools.cache
+def _environment(
+    cache_directory: str, keep_trailing_newline: bool
+) -> jinja2.Environment:
+    """
+    Make the Jinja environment to use for a cache directory.
+
+    Templates are "loaded" by their source text, so that the environment
+    keeps the compiled templates, and the bytecode cache can be used.
+    """
+    import jinja2  # pylint: disable=import-outside-toplevel
+
+    bytecode_cache = None
+    if cache_directory:
+        jinja_dir = os.path.join(cache_directory, "jinja")
+        try:
+            os.makedirs(jinja_dir, exist_ok=True)
+        except OSError as exc:
+            logger.debug(f"Couldn't make template cache {jinja_dir}: {exc}")
+        else:
+            bytecode_cache = jinja2.FileSystemBytecodeCache(jinja_dir)
+    return jinja2.Environment(
+        loader=jinja2.FunctionLoader(_template_source),
+        bytecode_cache=bytecode_cache,
+        keep_trailing_newline=keep_trailing_newline,
+    )
@@ -4,14 +4,12 @@ import concurrent.futures
 import logging
 from collections.abc import Iterable
 
-import markdown_it
-import requests
-
 logger = logging.getLogger(__name__)
 
 
 def find_links(markdown_text: str) -> Iterable[str]:
     """Find all the URLs in some Markdown text."""
+    import markdown_it  # pylint: disable=import-outside-toplevel
 
     def walk_tokens(tokens):
         for token in tokens:
@@ -36,6 +34,8 @@ def check_markdown_links(markdown_text: str) -> None:
 
 def check_one_link(url: str) -> None:
     """Check if a URL is reachable. Logs a warning if not."""
+    import requests  # pylint: disable=import-outside-toplevel
+
     try:
         resp = requests.head(url, timeout=60, allow_redirects=True)
     except Exception as exc:  # pylint: disable=broad-exception-caught
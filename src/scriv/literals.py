@@ -4,13 +4,23 @@ Find literals in various kinds of files.
 
 import ast
 import configparser
+import functools
 import os.path
-from collections.abc import MutableMapping
+import threading
+from collections.abc import Callable, Iterable, MutableMapping
 from typing import Any
 
 from .exceptions import ScrivException
 from .optional import tomllib, yaml
 
+# A function to look up a literal by name in a parsed file.
+LiteralLookup = Callable[[str], str | None]
+
+# The parsed files, by absolute file name: the file's (mtime, size) when it
+# was parsed, and the function to look up literals in it.
+_lookups: dict[str, tuple[tuple[int, int], LiteralLookup]] = {}
+_lookups_lock = threading.Lock()
+
 
 def find_literal(file_name: str, literal_name: str) -> str | None:
     """
@@ -19,12 +29,53 @@ def find_literal(file_name: str, literal_name: str) -> str | None:
     Returns:
         The string value found, or None if not found.
 
+    """
+    return find_literals(file_name, [literal_name])[literal_name]
+
+
+def find_literals(
+    file_name: str, literal_names: Iterable[str]
+) -> dict[str, str | None]:
+    """
+    Look inside a file for a number of literal values.
+
+    The file is only parsed once for all of the names, and isn't parsed again
+    until its modification time or size changes.
+
+    Returns:
+        A dict mapping each name to the string value found, or None if not
+        found.
+
+    """
+    lookup = _literal_lookup(file_name)
+    return {name: lookup(name) for name in literal_names}
+
+
+def _literal_lookup(file_name: str) -> LiteralLookup:
+    """
+    Get the function to look up literals in a file, parsing it if needed.
+    """
+    parse = _literal_parser(file_name)
+    stat = os.stat(file_name)
+    path = os.path.abspath(file_name)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _lookups_lock:
+        cached = _lookups.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    lookup = parse(file_name)
+    with _lookups_lock:
+        _lookups[path] = (signature, lookup)
+    return lookup
+
+
+def _literal_parser(file_name: str) -> Callable[[str], LiteralLookup]:
+    """
+    Get the function to parse a file for literals, based on its extension.
     """
     ext = os.path.splitext(file_name)[-1]
     if ext == ".py":
-        with open(file_name, encoding="utf-8") as f:
-            node = ast.parse(f.read())
-        return PythonLiteralFinder().find(node, literal_name)
+        return _parse_python
     elif ext == ".toml":
         if tomllib is None:
             msg = (
@@ -32,9 +83,7 @@ def find_literal(file_name: str, literal_name: str) -> str | None:
                 + "Install with [toml] extra"
             ).format(file_name)
             raise ScrivException(msg)
-        with open(file_name, encoding="utf-8") as f:
-            data = tomllib.loads(f.read())
-        return find_nested_value(data, literal_name)
+        return _parse_toml
     elif ext in (".yml", ".yaml"):
         if yaml is None:
             msg = (
@@ -42,24 +91,60 @@ def find_literal(file_name: str, literal_name: str) -> str | None:
                 + "Install with [yaml] extra"
             ).format(file_name)
             raise ScrivException(msg)
-        with open(file_name, encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-        return find_nested_value(data, literal_name)
+        return _parse_yaml
     elif ext == ".cabal":
-        with open(file_name, encoding="utf-8") as fp:
-            return [line for line in fp if line.startswith(literal_name + ":")][
-                0
-            ].split()[1]
+        return _parse_cabal
     elif ext == ".cfg":
-        cfg_parser = configparser.ConfigParser()
-        cfg_parser.read(file_name)
-        return find_nested_value(cfg_parser, literal_name)
+        return _parse_cfg
     else:
         raise ScrivException(
             f"Can't read literals from files like {file_name!r}"
         )
 
 
+def _parse_python(file_name: str) -> LiteralLookup:
+    """Parse a Python file, finding all the string assignments."""
+    with open(file_name, encoding="utf-8") as f:
+        node = ast.parse(f.read())
+    return PythonLiteralFinder().find_all(node).get
+
+
+def _parse_toml(file_name: str) -> LiteralLookup:
+    """Parse a TOML file."""
+    assert tomllib is not None
+    with open(file_name, encoding="utf-8") as f:
+        data = tomllib.loads(f.read())
+    return functools.partial(find_nested_value, data)
+
+
+def _parse_yaml(file_name: str) -> LiteralLookup:
+    """Parse a YAML file."""
+    assert yaml is not None
+    # The C loader is much faster, if PyYAML was built with it.
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(file_name, encoding="utf-8") as f:
+        data = yaml.load(f, Loader=loader)
+    return functools.partial(find_nested_value, data)
+
+
+def _parse_cabal(file_name: str) -> LiteralLookup:
+    """Parse a Cabal file, finding the first value of each field."""
+    fields: dict[str, str] = {}
+    with open(file_name, encoding="utf-8") as fp:
+        for line in fp:
+            name, colon, value = line.partition(":")
+            if colon and value.split():
+                fields.setdefault(name, value.split()[0])
+    return fields.get
+
+
+def _parse_cfg(file_name: str) -> LiteralLookup:
+    """Parse a .cfg file."""
+    cfg_parser = configparser.ConfigParser()
+    cfg_parser.read(file_name)
+    return functools.partial(find_nested_value, cfg_parser)
+
+
 class PythonLiteralFinder(ast.NodeVisitor):
     """
     A NodeVisitor that will find assignments in Python code.
@@ -67,8 +152,7 @@ class PythonLiteralFinder(ast.NodeVisitor):
 
     def __init__(self):  # noqa: D107
         super().__init__()
-        self.name = None
-        self.value = None
+        self.values: dict[str, str] = {}
 
     def find(self, node: ast.AST, name: str) -> str | None:
         """
@@ -78,31 +162,41 @@ class PythonLiteralFinder(ast.NodeVisitor):
             The string value found, or None if not found.
 
         """
-        self.name = name
-        self.value = None
+        return self.find_all(node).get(name)
+
+    def find_all(self, node: ast.AST) -> dict[str, str]:
+        """
+        Search the AST in `node` for all assignments of strings to names.
+
+        The last assignment to a name is the one that counts, so the whole
+        tree is searched, once, for all of the names.
+
+        Returns:
+            A dict mapping names to the string values found.
+
+        """
+        self.values = {}
         self.visit(node)
-        return self.value
+        return self.values
 
     def visit_Assign(self, node) -> None:  # noqa: D102 (inherited docstring)
         for target in node.targets:
             if isinstance(target, ast.Name):
-                if target.id == self.name:
-                    self.check_value(node.value)
+                self.check_value(target.id, node.value)
 
     def visit_AnnAssign(self, node) -> None:  # noqa: D102 (inherited docstring)
         if isinstance(node.target, ast.Name):
-            if node.target.id == self.name:
-                self.check_value(node.value)
+            self.check_value(node.target.id, node.value)
 
-    def check_value(self, value):
+    def check_value(self, name: str, value: ast.AST | None) -> None:
         """
         Check a value node to see if it's a string constant.
 
-        If it is, save the string value as `self.value`.
+        If it is, save the string value as the value of `name`.
         """
         if isinstance(value, ast.Constant):
             if isinstance(value.value, str):
-                self.value = value.value
+                self.values[name] = value.value
 
 
 def find_nested_value(data: MutableMapping[str, Any], name: str) -> str | None:
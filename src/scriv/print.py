@@ -6,11 +6,17 @@ import logging
 import os
 import pathlib
 import sys
+from collections.abc import Iterable
+from typing import TextIO
 
 import click
 
+from .changelog import Changelog
+from .format import SectionDict
 from .scriv import Scriv
+from .timing import phase, timed_iter
 from .util import Version, scriv_command
+from .watch import watch_fragments
 
 logger = logging.getLogger(__name__)
 
@@ -21,56 +27,222 @@ logger = logging.getLogger(__name__)
     default=None,
     help="The version of the changelog entry to extract.",
 )
+@click.option(
+    "--since",
+    default=None,
+    help="Extract the changelog entries from this version onward.",
+)
+@click.option(
+    "--until",
+    default=None,
+    help="Extract the changelog entries up to this version.",
+)
 @click.option(
     "--output",
     type=click.Path(),
     default=None,
     help="The path to a file to write the output to.",
 )
+@click.option(
+    "--split-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Write each extracted entry to its own file in this directory.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Print the fragments again each time they change.",
+)
 @scriv_command
 def print_(
     *,
     version: str | None,
+    since: str | None,
+    until: str | None,
     output: pathlib.Path | None,
+    split_dir: pathlib.Path | None,
+    watch: bool,
     config_file: str | None = None,
 ) -> None:
     """
-    Print collected fragments, or print an entry from the changelog.
+    Print collected fragments, or print entries from the changelog.
     """
+    if version is not None and (since is not None or until is not None):
+        sys.exit("Can't provide --version with --since or --until.")
+    if output is not None and split_dir is not None:
+        sys.exit("Can't provide both --output and --split-dir.")
+    if watch and (
+        version is not None
+        or since is not None
+        or until is not None
+        or split_dir is not None
+    ):
+        sys.exit("--watch only prints fragments, not changelog entries.")
+
     scriv = Scriv(config_file=config_file)
     changelog = scriv.changelog()
-    newline: str = os.linesep
 
-    if version is None:
+    if version is None and since is None and until is None and not split_dir:
+        if watch:
+            format_tools = changelog.format_tools()
+
+            def show(sections: SectionDict) -> None:
+                click.clear()
+                if not sections:
+                    logger.info("No changelog fragments to collect")
+                    return
+                lines = format_tools.iter_section_lines(sections)
+                write_contents(lines, output, os.linesep)
+                sys.stdout.flush()
+
+            watch_fragments(scriv, show)
+            return
+
         logger.info(f"Generating entry from {scriv.config.fragment_directory}")
         frags = scriv.fragments_to_combine()
         if not frags:
             logger.info("No changelog fragments to collect")
             sys.exit(2)
-        contents = changelog.entry_text(scriv.combine_fragments(frags)).strip()
-    else:
+        lines = changelog.format_tools().iter_section_lines(
+            scriv.combine_fragments(frags)
+        )
+        write_contents(timed_iter("render", lines), output, os.linesep)
+        return
+
+    if version is not None:
         logger.info(f"Extracting entry for {version} from {changelog.path}")
-        changelog.read()
-        newline = changelog.newline
-        target_version = Version(version)
-        for etitle, sections in changelog.entries().items():
-            eversion = Version.from_text(str(etitle))
-            if eversion is None:
+    else:
+        logger.info(f"Extracting entries from {changelog.path}")
+    changelog.read()
+    entries = list(
+        extract_entries(
+            changelog,
+            version=Version(version) if version is not None else None,
+            since=_version_option("--since", since),
+            until=_version_option("--until", until),
+        )
+    )
+    if not entries:
+        if version is not None:
+            logger.info(f"Unable to find version {version} in the changelog")
+        else:
+            logger.info("No matching entries in the changelog")
+        sys.exit(2)
+
+    if split_dir:
+        os.makedirs(split_dir, exist_ok=True)
+        for eversion, _, contents in entries:
+            path = pathlib.Path(split_dir) / f"{eversion}.{scriv.config.format}"
+            logger.info(f"Writing {path}")
+            write_contents([contents], path, changelog.newline)
+    elif version is not None:
+        write_contents([entries[0][2]], output, changelog.newline)
+    else:
+        # Several entries: give each one its heading.
+        format_tools = changelog.format_tools()
+        contents = "\n\n".join(
+            format_tools.format_header(title).strip() + "\n\n" + contents
+            for _, title, contents in entries
+        )
+        write_contents([contents], output, changelog.newline)
+
+
+def _version_option(option: str, value: str | None) -> Version | None:
+    """
+    Get the Version for an option's `value`, exiting if it isn't a version.
+    """
+    if value is None:
+        return None
+    version = Version(value)
+    if version.release is None:
+        sys.exit(f"{option} {value!r} isn't a version number.")
+    return version
+
+
+def extract_entries(
+    changelog: Changelog,
+    version: Version | None = None,
+    since: Version | None = None,
+    until: Version | None = None,
+) -> Iterable[tuple[Version, str, str]]:
+    """
+    Find the versioned entries in a changelog, in one pass.
+
+    If `version` is given, only that entry is produced, and the changelog is
+    parsed only as far as needed to find it.  Otherwise, all the entries with
+    versions between `since` and `until` (inclusive) are produced.
+
+    Produces (version, title, contents) tuples.
+    """
+    for etitle, sections in changelog.iter_entries():
+        eversion = Version.from_text(str(etitle))
+        if eversion is None:
+            continue
+        if version is not None:
+            if eversion != version:
                 continue
-            if eversion == target_version:
-                contents = f"{changelog.newline * 2}".join(sections).strip()
-                break
         else:
-            logger.info(f"Unable to find version {version} in the changelog")
-            sys.exit(2)
+            if since is not None and eversion < since:
+                continue
+            if until is not None and eversion > until:
+                continue
+        contents = f"{changelog.newline * 2}".join(sections).strip()
+        yield eversion, str(etitle), contents
+        if version is not None:
+            break
+
 
+def write_contents(
+    parts: Iterable[str],
+    output: str | os.PathLike[str] | None,
+    newline: str,
+) -> None:
+    """
+    Write the output of the print command.
+
+    The output is the `parts` joined with newlines and stripped, but it's
+    written as the parts are produced, rather than built in memory first.
+
+    If `output` is None, write to stdout with standard newlines.  Otherwise,
+    write to the `output` file, using `newline` between lines.
+    """
     if output:
         # Standardize newlines to match either the platform default
         # or to match the existing newlines found in the CHANGELOG.
-        contents_raw = newline.join(contents.splitlines()).encode("utf-8")
-        with open(output, "wb") as file:
-            file.write(contents_raw)
+        with (
+            phase("write"),
+            open(output, "w", encoding="utf-8", newline="") as file,
+        ):
+            write_stripped(parts, file, newline)
     else:
         # Standardize newlines to just '\n' when writing to STDOUT.
-        contents = "\n".join(contents.splitlines())
-        print(contents)
+        write_stripped(parts, sys.stdout, "\n")
+        sys.stdout.write("\n")
+
+
+def write_stripped(parts: Iterable[str], outfile: TextIO, newline: str) -> None:
+    """
+    Write `parts` joined with newlines, stripped, to `outfile`.
+
+    Line breaks are written as `newline`.  Whitespace is held back until more
+    text follows it, so that nothing is written for the whitespace that
+    stripping would remove.  Each write ends with text that isn't whitespace,
+    so a line break is never split between two writes.
+    """
+    started = False
+    held = ""
+    for i, part in enumerate(parts):
+        if i:
+            part = "\n" + part
+        if not started:
+            part = part.lstrip()
+            if not part:
+                continue
+            started = True
+        text = part.rstrip()
+        if text:
+            outfile.write(newline.join((held + text).splitlines()))
+            held = part[len(text) :]
+        else:
+            held += part
@@ -1,21 +1,27 @@
 """Central Scriv class."""
 
 import collections
+import concurrent.futures
 import datetime
-import itertools
+import fnmatch
+import os
 import re
 import textwrap
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 from pathlib import Path
 
-import jinja2
-
+from .cache import SectionCache, section_cache
 from .changelog import Changelog, Fragment
 from .config import Config
-from .format import SectionDict, get_format_tools
+from .format import BUILTIN_FORMATS, SectionDict, get_format_tools
 from .gitinfo import current_branch_name, user_nick
+from .jinja import get_template
+from .timing import phase
 from .util import order_dict
 
+# The suffixes of fragment files, in addition to the configured format's.
+FRAGMENT_SUFFIXES = frozenset("." + fmt for fmt in BUILTIN_FORMATS)
+
 
 class Scriv:
     """Public API to the scriv application."""
@@ -31,6 +37,10 @@ class Scriv:
             self.config = Config.read(config_file)
         else:
             self.config = config
+        # While combining fragments with a cache directory configured: the
+        # cached parsed sections, and the ones used, by SectionCache.key.
+        self._cached_sections: dict[str, SectionDict] | None = None
+        self._used_sections: dict[str, SectionDict] = {}
 
     def new_fragment(self) -> Fragment:
         """
@@ -44,30 +54,111 @@ class Scriv:
 
     def fragments_to_combine(self) -> list[Fragment]:
         """Get the list of fragments to combine."""
-        return [Fragment(path=path) for path in _files_to_combine(self.config)]
+        top = Path(self.config.fragment_directory)
+        categories = set(self.config.categories)
+        fragments = []
+        for path in _files_to_combine(self.config):
+            category = None
+            if path.parent != top:
+                subdir = path.relative_to(top).parts[0]
+                if subdir in categories:
+                    category = subdir
+            fragments.append(Fragment(path=path, category=category))
+        return fragments
 
     def sections_from_fragment(self, fragment: Fragment) -> SectionDict:
         """
         Collect the sections from a fragment.
         """
-        fragment.read()
-        format_tools = get_format_tools(fragment.format, self.config)
+        with phase("read"):
+            fragment.read()
         text = fragment.content.rstrip()
-        file_sections = format_tools.parse_text(text)
+        file_sections = None
+        key = None
+        if self._cached_sections is not None:
+            key = SectionCache.key(
+                fragment.format, self.config.start_marker, text
+            )
+            file_sections = self._cached_sections.get(key)
+        if file_sections is None:
+            with phase("parse"):
+                format_tools = get_format_tools(fragment.format, self.config)
+                file_sections = format_tools.parse_text(text)
+        if key is not None:
+            self._used_sections[key] = file_sections
+        if fragment.category is not None and None in file_sections:
+            # Text outside any section belongs to the fragment's category.
+            sections: SectionDict = {
+                fragment.category: list(file_sections[None])
+            }
+            for section, paragraphs in file_sections.items():
+                if section is not None:
+                    sections.setdefault(section, []).extend(paragraphs)
+            file_sections = sections
         return file_sections
 
     def combine_fragments(self, fragments: Iterable[Fragment]) -> SectionDict:
         """
         Read fragments and produce a combined SectionDict of their contents.
+
+        The fragments are read and parsed by a pool of threads, but the
+        result is the same as reading them one at a time, in order.
+
+        If a cache directory is configured, fragments parsed before aren't
+        parsed again.
+        """
+        cache = section_cache(self.config)
+        if cache is None:
+            all_sections = self._read_fragments(fragments)
+        else:
+            with phase("read"):
+                self._cached_sections = cache.get_table("fragments")
+            self._used_sections = {}
+            try:
+                all_sections = self._read_fragments(fragments)
+                # Keep only the fragments used this time, so the cache doesn't
+                # grow forever.
+                if self._used_sections.keys() != self._cached_sections.keys():
+                    with phase("write"):
+                        cache.put_table("fragments", self._used_sections)
+            finally:
+                self._cached_sections = None
+                self._used_sections = {}
+        return self.merge_sections(all_sections)
+
+    def merge_sections(
+        self, all_sections: Iterable[SectionDict]
+    ) -> SectionDict:
+        """
+        Merge the sections of a number of fragments into one SectionDict.
         """
         sections: SectionDict = collections.defaultdict(list)
-        for fragment in fragments:
-            frag_sections = self.sections_from_fragment(fragment)
+        for frag_sections in all_sections:
             for section, paragraphs in frag_sections.items():
                 sections[section].extend(paragraphs)
         sections = order_dict(sections, [None] + self.config.categories)
         return sections
 
+    def _read_fragments(
+        self, fragments: Iterable[Fragment]
+    ) -> list[SectionDict]:
+        """
+        Get the sections from each of the fragments, in the same order.
+        """
+        fragments = list(fragments)
+        workers = min(int(self.config.fragment_workers), len(fragments))
+        if workers > 1:
+            # Resolve the settings used for parsing before starting threads,
+            # so that each is only resolved once.
+            _ = self.config.start_marker
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="scriv-fragment"
+            ) as executor:
+                return list(
+                    executor.map(self.sections_from_fragment, fragments)
+                )
+        return [self.sections_from_fragment(frag) for frag in fragments]
+
     def changelog(self) -> Changelog:
         """Get the Changelog object."""
         return Changelog(
@@ -100,24 +191,74 @@ def _new_fragment_path(config: Config) -> Path:
 
 def _new_fragment_content(config: Config) -> str:
     """Produce the initial content of a scriv fragment."""
-    return jinja2.Template(
-        textwrap.dedent(config.new_fragment_template),
-        keep_trailing_newline=True,
-    ).render(config=config)
+    with phase("render"):
+        return get_template(
+            config,
+            textwrap.dedent(config.new_fragment_template),
+            keep_trailing_newline=True,
+        ).render(config=config)
 
 
 def _files_to_combine(config: Config) -> list[Path]:
     """
     Find all the fragment file paths to be combined.
 
-    The paths are returned in the order they should be processed.
+    The fragment directory is scanned once, and subdirectories too if
+    `fragment_subdirectories` is set.  The paths are returned in the order
+    they should be processed: by file name, so that fragments in different
+    subdirectories are still in time order.
+
+    """
+    with phase("discovery"):
+        skip_name, skip_path = _skip_matchers(config.skip_fragments)
+        recurse = config.fragment_subdirectories
+        top = config.fragment_directory
+        suffixes = FRAGMENT_SUFFIXES | {"." + config.format}
+        found: list[tuple[str, str, str]] = []
+        subdirs = [""]
+        while subdirs:
+            subdir = subdirs.pop()
+            try:
+                entries = os.scandir(os.path.join(top, subdir))
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    normname = os.path.normcase(name)
+                    if skip_name(normname):
+                        continue
+                    if skip_path and any(
+                        Path(entry.path).match(pat) for pat in skip_path
+                    ):
+                        continue
+                    if entry.is_file():
+                        if os.path.splitext(normname)[1] in suffixes:
+                            found.append((normname, subdir, name))
+                    elif recurse and entry.is_dir():
+                        subdirs.append(os.path.join(subdir, name))
+        found.sort()
+        return [Path(top, subdir, name) for _, subdir, name in found]
+
 
+def _skip_matchers(
+    patterns: list[str],
+) -> tuple[Callable[[str], re.Match[str] | None], list[str]]:
     """
-    paths: Iterable[Path] = itertools.chain.from_iterable(
-        [
-            Path(config.fragment_directory).glob(pattern)
-            for pattern in ["*.rst", "*.md"]
-        ]
-    )
-    paths = (fname for fname in paths if not fname.match(config.skip_fragments))
-    return sorted(paths)
+    Make matchers for the `skip_fragments` patterns.
+
+    Patterns with no directory separators are compiled into one regex for
+    matching file names (already normalized with os.path.normcase).  The rest
+    are returned as a list, to be matched against whole paths.
+
+    """
+    name_patterns = []
+    path_patterns = []
+    for pattern in patterns:
+        if "/" in pattern or os.sep in pattern:
+            path_patterns.append(pattern)
+        else:
+            name_patterns.append(fnmatch.translate(os.path.normcase(pattern)))
+    # With no patterns, use a regex that never matches.
+    name_regex = re.compile("|".join(name_patterns) or r"(?!)")
+    return name_regex.match, path_patterns
@@ -0,0 +1,287 @@
+"""Serving requests from a long-running scriv."""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+from collections.abc import Callable
+from typing import Any
+
+import click
+
+from .changelog import Changelog
+from .check import check_sections
+from .config import Config, file_signature
+from .create import create_fragment
+from .exceptions import ScrivException
+from .gitinfo import git_add, git_config_bool, git_info
+from .print import extract_entries, write_stripped
+from .scriv import Scriv
+from .util import Version, scriv_command
+from .watch import FragmentWatcher
+
+logger = logging.getLogger(__name__)
+
+# The socket to use if none is given.
+DEFAULT_SOCKET = ".scriv.sock"
+
+# The requests the server answers.
+REQUESTS = ["preview", "check", "print", "create"]
+
+
+class ScrivServer:
+    """
+    Answer requests, keeping scriv's data in memory between them.
+
+    Before each request, the files the answer depends on are checked, and only
+    the ones that changed are read again: the configuration is re-read if any
+    of the files it came from changed, each fragment is re-parsed only if it
+    changed, and the changelog is re-read only if it changed.
+
+    Requests can come from more than one thread, but are answered one at a
+    time.
+    """
+
+    def __init__(self, config_file: str | None = None):
+        """Create a server using the configuration in `config_file`."""
+        self.config_file = config_file
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Read the configuration, and forget everything that came from it."""
+        config = Config.read(self.config_file)
+        self.scriv = Scriv(config=config)
+        self.watcher = FragmentWatcher(self.scriv)
+        # The signatures of the files the configuration came from.
+        self._sources: dict[str, list[int] | None] = {}
+        self._note_sources()
+        self._changelog: Changelog | None = None
+        self._changelog_signature: list[int] | None = None
+        self._entries: list[tuple[Version, str]] = []
+
+    def _note_sources(self) -> bool:
+        """
+        Record the signatures of the configuration's files.
+
+        Settings can read files when they are first used, so new sources can
+        appear after the configuration is read.  Returns True if any of the
+        sources already recorded has changed.
+        """
+        changed = False
+        for path in self.scriv.config.sources:
+            signature = file_signature(path)
+            if path not in self._sources:
+                self._sources[path] = signature
+            elif self._sources[path] != signature:
+                changed = True
+        return changed
+
+    def refresh(self) -> None:
+        """Re-read the configuration if it has changed."""
+        if self._note_sources():
+            logger.info("Configuration changed, reading it again")
+            self._load()
+        # Git settings are read once per process, but a server runs for a
+        # long time.  Reading them again is only one git command, and only
+        # for the requests that use them.
+        git_info.cache_clear()
+
+    def handle(self, request: Any) -> dict[str, Any]:
+        """
+        Answer one request.
+
+        A request is a dict with a "command" key, naming one of `REQUESTS`.
+        The response is a dict with "ok", and either "output" or "error".
+        """
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "Requests must be JSON objects"}
+        command = request.get("command")
+        handlers: dict[str, Callable[[dict[str, Any]], str]] = {
+            "preview": self.preview,
+            "check": self.check,
+            "print": self.print_,
+            "create": self.create,
+        }
+        handler = handlers.get(command) if isinstance(command, str) else None
+        if handler is None:
+            return {"ok": False, "error": f"Unknown request: {command!r}"}
+        logger.debug(f"Request: {request}")
+        try:
+            with self._lock:
+                self.refresh()
+                output = handler(request)
+        except ScrivException as exc:
+            return {"ok": False, "error": str(exc)}
+        return {"ok": True, "output": output}
+
+    def preview(self, _request: dict[str, Any]) -> str:
+        """Render the fragments as the changelog entry they'll become."""
+        self.watcher.poll()
+        if self.watcher.errors:
+            # scriv collect would fail on these, so don't leave them out.
+            raise ScrivException(
+                "\n".join(
+                    f"{path}: Couldn't read fragment: {error}"
+                    for path, error in sorted(self.watcher.errors.items())
+                )
+            )
+        sections = self.watcher.sections()
+        if not sections:
+            raise ScrivException("No changelog fragments to collect")
+        lines = (
+            self.scriv.changelog().format_tools().iter_section_lines(sections)
+        )
+        output = io.StringIO()
+        write_stripped(lines, output, "\n")
+        return output.getvalue() + "\n"
+
+    def check(self, _request: dict[str, Any]) -> str:
+        """Check that the fragments are ready to be collected."""
+        self.watcher.poll()
+        fragment_sections = self.watcher.fragment_sections()
+        problems: list[str] = []
+        for path, sections in fragment_sections.items():
+            if sections is None:
+                frag_problems = [
+                    f"Couldn't read fragment: {self.watcher.errors[path]}"
+                ]
+            else:
+                frag_problems = check_sections(self.scriv, sections)
+            problems.extend(f"{path}: {problem}" for problem in frag_problems)
+        if problems:
+            num = len(problems)
+            problems.append(
+                f"{num} {'problem' if num == 1 else 'problems'}"
+                + f" in {len(fragment_sections)} fragments"
+            )
+            raise ScrivException("\n".join(problems))
+        return f"Checked {len(fragment_sections)} fragments\n"
+
+    def print_(self, request: dict[str, Any]) -> str:
+        """Get the changelog entry for a version."""
+        if not request.get("version"):
+            raise ScrivException("A print request needs a version")
+        version = Version(str(request["version"]))
+        for eversion, contents in self._changelog_entries():
+            if eversion == version:
+                return contents + "\n"
+        raise ScrivException(
+            f"Unable to find version {request['version']} in the changelog"
+        )
+
+    def _changelog_entries(self) -> list[tuple[Version, str]]:
+        """Get the versioned entries in the changelog, reading it if needed."""
+        path = self.scriv.config.changelog
+        signature = file_signature(path)
+        if self._changelog is None or signature != self._changelog_signature:
+            self._changelog = self.scriv.changelog()
+            self._changelog.read()
+            self._changelog_signature = signature
+            self._entries = [
+                (eversion, contents)
+                for eversion, _, contents in extract_entries(self._changelog)
+            ]
+        return self._entries
+
+    def create(self, _request: dict[str, Any]) -> str:
+        """
+        Create a new fragment, and return its path.
+
+        Like ``scriv create``, the fragment is added to git if the
+        scriv.create.add git setting is true.  It isn't opened in an editor.
+        """
+        file_path = create_fragment(self.scriv).path
+        if git_config_bool("scriv.create.add"):
+            try:
+                git_add(file_path)
+            except SystemExit as exc:
+                # git_add exits on failure, but the server has to keep going.
+                raise ScrivException(f"Couldn't add {file_path}") from exc
+        return f"{file_path}\n"
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Read JSON requests, one per line, and write a JSON response to each."""
+
+    server: _Server
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {"ok": False, "error": "Requests must be JSON"}
+            else:
+                response = self.server.scriv_server.handle(request)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """
+        A Unix socket server for a ScrivServer.
+
+        Each connection is handled in its own thread, so a client that keeps
+        its connection open doesn't keep other clients waiting.
+        """
+
+        daemon_threads = True
+
+        def __init__(self, socket_path: str, scriv_server: ScrivServer):
+            self.scriv_server = scriv_server
+            super().__init__(socket_path, _RequestHandler)
+
+
+def is_listening(socket_path: str) -> bool:
+    """Check whether a server is listening on the socket at `socket_path`."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    default=DEFAULT_SOCKET,
+    type=click.Path(dir_okay=False),
+    help=f"The Unix socket to listen on, default {DEFAULT_SOCKET}.",
+)
+@scriv_command
+def serve(
+    *,
+    socket_path: str,
+    config_file: str | None,
+) -> None:
+    """
+    Answer requests from scriv client, keeping data in memory.
+
+    The server runs until interrupted with Ctrl-C.
+    """
+    if not hasattr(socketserver, "UnixStreamServer"):
+        sys.exit("scriv serve needs Unix sockets, which aren't available here")
+    if os.path.exists(socket_path):
+        if is_listening(socket_path):
+            sys.exit(f"A scriv server is already listening on {socket_path}")
+        os.unlink(socket_path)
+
+    scriv_server = ScrivServer(config_file)
+    with _Server(socket_path, scriv_server) as server:
+        logger.info(f"Listening on {socket_path}, press Ctrl-C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
@@ -1,8 +1,24 @@
 """Helpers for using subprocesses."""
 
+from __future__ import annotations
+
+import contextlib
+import json
 import logging
+import os
+import secrets
 import shlex
+import signal
 import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import attr
+
+from . import __version__
 
 # The return value of run_command.
 CmdResult = tuple[bool, str]
@@ -10,6 +26,194 @@ CmdResult = tuple[bool, str]
 logger = logging.getLogger(__name__)
 
 
+@attr.s
+class CommandRecord:
+    """
+    What happened when one command was run.
+    """
+
+    # The command, as a list of arguments, or a string for a shell command.
+    cmd = attr.ib(type=str | list[str])
+    shell = attr.ib(type=bool)
+    # Wall-clock start, and duration, in nanoseconds.
+    start_ns = attr.ib(type=int)
+    duration_ns = attr.ib(type=int)
+    returncode = attr.ib(type=int)
+    # The number of bytes of output, or None if the output wasn't captured.
+    output_bytes = attr.ib(type=int | None)
+
+
+class CommandRecorder:
+    """
+    Keep a record of the commands scriv runs, for --profile and --trace.
+    """
+
+    def __init__(self) -> None:
+        """Make a disabled recorder."""
+        self.enabled = False
+        self.start_ns = 0
+        self.records: list[CommandRecord] = []
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start recording, forgetting anything recorded before."""
+        self.enabled = True
+        self.start_ns = time.time_ns()
+        self.records = []
+
+    def disable(self) -> None:
+        """Stop recording."""
+        self.enabled = False
+
+    @contextlib.contextmanager
+    def record(
+        self, cmd: str | list[str], shell: bool = False
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Record the command run in the `with` block.
+
+        The block fills in "returncode" and "output" in the dict it's given.
+        """
+        result: dict[str, Any] = {"returncode": None, "output": None}
+        start_ns = time.time_ns()
+        start = time.perf_counter_ns()
+        try:
+            yield result
+        finally:
+            duration_ns = time.perf_counter_ns() - start
+            output = result["output"]
+            logger.debug(
+                f"Command took {duration_ns / 1e9:.3f}s: {cmd!r}",
+            )
+            if self.enabled:
+                rec = CommandRecord(
+                    cmd=cmd,
+                    shell=shell,
+                    start_ns=start_ns,
+                    duration_ns=duration_ns,
+                    returncode=(
+                        -1
+                        if result["returncode"] is None
+                        else result["returncode"]
+                    ),
+                    output_bytes=None if output is None else len(output),
+                )
+                with self._lock:
+                    self.records.append(rec)
+
+    def report(self) -> str:
+        """Produce a textual report of the commands run."""
+        total = sum(rec.duration_ns for rec in self.records) / 1e9
+        lines = [f"Commands: {len(self.records)} run, {total:.3f}s"]
+        for rec in self.records:
+            cmd = rec.cmd if isinstance(rec.cmd, str) else shlex.join(rec.cmd)
+            lines.append(
+                f"  {rec.duration_ns / 1e9:9.3f}s  [{rec.returncode}]  {cmd}"
+            )
+        return "\n".join(lines)
+
+    def trace_json(self, name: str = "scriv") -> dict[str, Any]:
+        """
+        Make an OTLP JSON trace of the recorded commands.
+
+        A root span named `name` covers the time from when recording started
+        until now.  Each command is a child span.
+        """
+        trace_id = secrets.token_hex(16)
+        root_id = secrets.token_hex(8)
+        root = {
+            "traceId": trace_id,
+            "spanId": root_id,
+            "name": name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(time.time_ns()),
+            "attributes": [
+                _attribute("process.command_args", sys.argv),
+                _attribute("process.pid", os.getpid()),
+            ],
+            "status": {},
+        }
+        spans = [root]
+        for rec in self.records:
+            if isinstance(rec.cmd, str):
+                args = [rec.cmd]
+                span_name = rec.cmd.split(None, 2)[:2]
+            else:
+                args = rec.cmd
+                span_name = rec.cmd[:2]
+            attributes = [
+                _attribute("process.command_args", args),
+                _attribute("process.exit.code", rec.returncode),
+                _attribute("scriv.shell", rec.shell),
+            ]
+            if rec.output_bytes is not None:
+                attributes.append(
+                    _attribute("scriv.output.bytes", rec.output_bytes)
+                )
+            spans.append(
+                {
+                    "traceId": trace_id,
+                    "spanId": secrets.token_hex(8),
+                    "parentSpanId": root_id,
+                    "name": " ".join(span_name),
+                    "kind": 3,  # SPAN_KIND_CLIENT
+                    "startTimeUnixNano": str(rec.start_ns),
+                    "endTimeUnixNano": str(rec.start_ns + rec.duration_ns),
+                    "attributes": attributes,
+                    # STATUS_CODE_OK or STATUS_CODE_ERROR
+                    "status": {"code": 1 if rec.returncode == 0 else 2},
+                }
+            )
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            _attribute("service.name", "scriv"),
+                            _attribute("service.version", __version__),
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {
+                                "name": "scriv.shell",
+                                "version": __version__,
+                            },
+                            "spans": spans,
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def write_trace(self, path: str | os.PathLike[str]) -> None:
+        """Write an OTLP JSON trace of the recorded commands to `path`."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.trace_json(), f, indent=2)
+            f.write("\n")
+
+
+def _attribute(key: str, value: Any) -> dict[str, Any]:
+    """Make an OTLP JSON attribute."""
+    return {"key": key, "value": _any_value(value)}
+
+
+def _any_value(value: Any) -> dict[str, Any]:
+    """Make an OTLP JSON AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # 64-bit integers are strings in OTLP JSON.
+        return {"intValue": str(value)}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_any_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+recorder = CommandRecorder()
+
+
 def run_command(cmd: str | list[str]) -> CmdResult:
     """
     Run a command line (with no shell).
@@ -22,13 +226,16 @@ def run_command(cmd: str | list[str]) -> CmdResult:
     logger.debug(f"Running command {cmd!r}")
     if isinstance(cmd, str):
         cmd = shlex.split(cmd, posix=False)
-    proc = subprocess.run(
-        cmd,
-        shell=False,
-        check=False,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-    )
+    with recorder.record(cmd) as result:
+        proc = subprocess.run(
+            cmd,
+            shell=False,
+            check=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        result["returncode"] = proc.returncode
+        result["output"] = proc.stdout
     output = proc.stdout.decode("utf-8")
     logger.debug(
         f"Command exited with {proc.returncode} status. Output: {output!r}"
@@ -47,20 +254,58 @@ def run_simple_command(cmd: str | list[str]) -> str:
     return out.strip()
 
 
-def run_shell_command(cmd: str) -> CmdResult:
+def run_shell_command(cmd: str, timeout: float | None = None) -> CmdResult:
     """
     Run a command line with a shell.
+
+    If `timeout` is given, the command (and anything it started) is killed if
+    it runs longer than that many seconds, and the command fails.
     """
     logger.debug(f"Running shell command {cmd!r}")
-    proc = subprocess.run(
-        cmd,
-        shell=True,
-        check=False,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-    )
-    output = proc.stdout.decode("utf-8")
+    timed_out = False
+    with recorder.record(cmd, shell=True) as result:
+        with subprocess.Popen(
+            cmd,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            # Put the command in its own process group, so that it and its
+            # children can all be killed if it takes too long.
+            start_new_session=timeout is not None and os.name == "posix",
+        ) as proc:
+            try:
+                stdout, _ = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                _kill_process_group(proc)
+                stdout, _ = proc.communicate()
+        result["returncode"] = proc.returncode
+        result["output"] = stdout
+    output = stdout.decode("utf-8")
+    if timed_out:
+        logger.debug(f"Command timed out after {timeout} seconds")
+        return False, f"Timed out after {timeout:g} seconds\n{output}"
     logger.debug(
         f"Command exited with {proc.returncode} status. Output: {output!r}"
     )
     return proc.returncode == 0, output
+
+
+def _kill_process_group(proc: subprocess.Popen[bytes]) -> None:
+    """Kill a process started by run_shell_command, and its children."""
+    if os.name == "posix":
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGKILL)
+    else:
+        proc.kill()
+
+
+def call_command(cmd: list[str]) -> int:
+    """
+    Run a command with its output going to ours, and return its exit status.
+    """
+    logger.debug(f"Running command {cmd!r}")
+    with recorder.record(cmd) as result:
+        ret = subprocess.call(cmd)
+        result["returncode"] = ret
+    return ret
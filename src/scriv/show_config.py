@@ -0,0 +1,67 @@
+"""Showing the configuration."""
+
+from __future__ import annotations
+
+import sys
+
+import attr
+import click
+
+from .config import Config, _Options
+from .exceptions import ScrivException
+from .util import scriv_command
+
+
+@click.command(name="config")
+@click.argument("names", metavar="[NAME]...", nargs=-1)
+@click.option(
+    "--dump",
+    is_flag=True,
+    help="Show the settings, and where each one came from.",
+)
+@scriv_command
+def show_config(
+    *,
+    names: tuple[str, ...],
+    dump: bool,
+    config_file: str | None,
+) -> None:
+    """
+    Show the values of settings.
+    """
+    if not names and not dump:
+        sys.exit("Give the names of settings to show, or use --dump.")
+    all_names = [attrdef.name for attrdef in attr.fields(_Options)]
+    for name in names:
+        if name not in all_names:
+            sys.exit(f"Scriv configuration has no {name!r} option")
+
+    config = Config.read(config_file)
+    for name in names or all_names:
+        if dump:
+            click.echo(dump_setting(config, name))
+        else:
+            value = getattr(config, name)
+            if isinstance(value, list):
+                value = "\n".join(value)
+            click.echo(value)
+
+
+def dump_setting(config: Config, name: str) -> str:
+    """
+    Describe a setting: its value, and where it came from.
+    """
+    origin = config.origins.get(name, "default")
+    try:
+        value = getattr(config, name)
+    except ScrivException as exc:
+        value = None
+        shown = f"<{exc}>"
+    else:
+        shown = repr(value)
+    # pylint: disable=protected-access
+    raw = getattr(config._options, name)
+    if isinstance(raw, str) and raw != value and not isinstance(value, list):
+        # Show the setting that was resolved to get the value.
+        origin += f": {raw!r}"
+    return f"{name} = {shown}  # {origin}"
@@ -0,0 +1,128 @@
+"""Timing the phases of scriv's work, for the --profile option."""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# The phases we time, in the order they are reported.
+PHASES = [
+    "config",
+    "discovery",
+    "read",
+    "parse",
+    "render",
+    "write",
+    "vcs",
+    "network",
+]
+
+
+class PhaseTimer:
+    """
+    Accumulate the time spent in each phase.
+
+    Phases can nest: time is only charged to the innermost phase, so that the
+    total of all the phases is the time spent in any of them.
+
+    """
+
+    def __init__(self) -> None:
+        """Make a disabled timer."""
+        self.enabled = False
+        self.start = 0.0
+        self.totals: dict[str, float] = collections.defaultdict(float)
+        self.counts: dict[str, int] = collections.defaultdict(int)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self) -> None:
+        """Start timing, forgetting anything timed before."""
+        self.enabled = True
+        self.start = time.perf_counter()
+        self.totals.clear()
+        self.counts.clear()
+
+    def disable(self) -> None:
+        """Stop timing."""
+        self.enabled = False
+
+    def _stack(self) -> list[list]:
+        """Get the stack of active [phase, start] pairs for this thread."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _charge(self, name: str, seconds: float, count: int = 0) -> None:
+        with self._lock:
+            self.totals[name] += seconds
+            self.counts[name] += count
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Charge the time spent in the `with` block to phase `name`."""
+        if not self.enabled:
+            yield
+            return
+        stack = self._stack()
+        now = time.perf_counter()
+        if stack:
+            # Pause the enclosing phase.
+            outer = stack[-1]
+            self._charge(outer[0], now - outer[1])
+        stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            _, start = stack.pop()
+            self._charge(name, now - start, count=1)
+            if stack:
+                stack[-1][1] = now
+
+    def report(self) -> str:
+        """Produce a textual report of the phase times."""
+        elapsed = time.perf_counter() - self.start
+        lines = ["Phase times:"]
+        names = PHASES + sorted(set(self.totals) - set(PHASES))
+        for name in names:
+            if name in self.totals:
+                lines.append(
+                    f"  {name:<12}{self.totals[name]:9.3f}s"
+                    + f"  ({self.counts[name]} times)"
+                )
+        other = elapsed - sum(self.totals.values())
+        lines.append(f"  {'other':<12}{other:9.3f}s")
+        lines.append(f"  {'total':<12}{elapsed:9.3f}s")
+        return "\n".join(lines)
+
+
+timer = PhaseTimer()
+
+
+def phase(name: str) -> contextlib.AbstractContextManager[None]:
+    """Charge the time spent in a `with` block to phase `name`."""
+    return timer.phase(name)
+
+
+def timed_iter(name: str, iterable: Iterable[T]) -> Iterator[T]:
+    """
+    Charge the time spent producing items from `iterable` to phase `name`.
+
+    The time the consumer spends between items is not included.
+    """
+    iterator = iter(iterable)
+    while True:
+        with phase(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
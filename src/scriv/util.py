@@ -8,7 +8,7 @@ import logging
 import re
 import sys
 from collections.abc import Sequence
-from typing import TypeVar
+from typing import Any, TypeVar
 
 import click
 import click_log
@@ -42,6 +42,11 @@ def order_dict(
     return with_order
 
 
+# The characters that str.splitlines() considers line boundaries.
+LINE_BREAKS = "\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+LINE_END_REGEX = re.compile(r"\r\n|[" + LINE_BREAKS + "]")
+
+
 def partition_lines(text: str, marker: str) -> tuple[str, str, str]:
     """
     Split `text` by lines, similar to str.partition.
@@ -49,16 +54,15 @@ def partition_lines(text: str, marker: str) -> tuple[str, str, str]:
     The splitting line is the first line containing `marker`.
 
     """
-    lines = text.splitlines(keepends=True)
-    marker_pos = [i for i, line in enumerate(lines) if marker in line]
-    if not marker_pos:
+    # Find the marker with a plain string search, then widen to the line
+    # around it, rather than splitting the whole text into lines.
+    pos = text.find(marker)
+    if pos < 0:
         return (text, "", "")
-    pos = marker_pos[0]
-    return (
-        "".join(lines[:pos]),
-        lines[pos],
-        "".join(lines[pos + 1 :]),
-    )
+    start = max(text.rfind(ch, 0, pos) for ch in LINE_BREAKS) + 1
+    m = LINE_END_REGEX.search(text, pos)
+    end = m.end() if m else len(text)
+    return (text[:start], text[start:end], text[end:])
 
 
 VERSION_REGEX = r"""(?ix)   # based on https://peps.python.org/pep-0440/
@@ -75,17 +79,122 @@ VERSION_REGEX = r"""(?ix)   # based on https://peps.python.org/pep-0440/
     """
 
 
+# The start of a version: an epoch and the release numbers.
+RELEASE_REGEX = re.compile(r"(?i)v?(?:(\d+)!)?(\d+(?:\.\d+)*)")
+
+# One segment of the rest of a version: a label with an optional number, like
+# ".beta3" or "-post1", or an implicit post-release number, like "-1".
+SEGMENT_REGEX = re.compile(r"(?i)[-._]?([a-z]+)[-._]?(\d*)|-(\d+)")
+
+# Spellings of pre-release labels, normalized as in PEP 440.
+PRE_LABELS = {
+    "alpha": "a",
+    "beta": "b",
+    "c": "rc",
+    "pre": "rc",
+    "preview": "rc",
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_version(vtext: str) -> tuple[Any, ...]:
+    """
+    Break a version string into its parts, and a key to sort it by.
+
+    Returns a tuple: (epoch, release, pre, post, dev, local, key).  If the
+    string isn't a version number, all of the parts are None.
+
+    Results are cached, since the same strings are parsed over and over.
+    """
+    norm = vtext.lstrip("v")
+    unparsed = (None, None, None, None, None, None, ((-1,), norm))
+    m = RELEASE_REGEX.match(vtext)
+    if not m:
+        return unparsed
+    epoch = int(m[1] or 0)
+    release = tuple(int(n) for n in m[2].split("."))
+    rest, plus, local_text = vtext[m.end() :].partition("+")
+    if plus and not re.fullmatch(r"\w[\w.]*", local_text):
+        return unparsed
+    local = tuple(re.split(r"[-._]", local_text.lower())) if plus else None
+
+    pre = post = dev = None
+    pos = 0
+    while pos < len(rest):
+        seg = SEGMENT_REGEX.match(rest, pos)
+        if not seg:
+            return unparsed
+        pos = seg.end()
+        if seg[3]:
+            post = int(seg[3])
+            continue
+        label = seg[1].lower()
+        number = int(seg[2] or 0)
+        if label in ("post", "rev", "r"):
+            post = number
+        elif label == "dev":
+            dev = number
+        else:
+            pre = (PRE_LABELS.get(label, label), number)
+
+    # Sort like PEP 440: 1.0.dev1 < 1.0a1 < 1.0 < 1.0.post1 < 1.0+local.
+    # Trailing zeros don't change the order: 1.0 sorts with 1.0.0.
+    release_key = release
+    while len(release_key) > 1 and release_key[-1] == 0:
+        release_key = release_key[:-1]
+    if pre is not None:
+        pre_key: tuple[Any, ...] = (1, *pre)
+    elif dev is not None and post is None:
+        pre_key = (0,)
+    else:
+        pre_key = (2,)
+    post_key = (0,) if post is None else (1, post)
+    dev_key = (2,) if dev is None else (1, dev)
+    if local is None:
+        local_key: tuple[Any, ...] = (0,)
+    else:
+        local_key = (
+            1,
+            tuple((1, int(s)) if s.isdigit() else (0, s) for s in local),
+        )
+    key = ((epoch, release_key, pre_key, post_key, dev_key, local_key), norm)
+    return (epoch, release, pre, post, dev, local, key)
+
+
+@functools.total_ordering
 class Version:
     """
     A version string that compares correctly.
 
-    For example, "v1.2.3" and "1.2.3" are considered the same.
+    For example, "v1.2.3" and "1.2.3" are considered the same.  Versions are
+    ordered as described in PEP 440.  Strings that aren't version numbers
+    sort before all real versions.
 
     """
 
+    __slots__ = (
+        "vtext",
+        "epoch",
+        "release",
+        "pre",
+        "post",
+        "dev",
+        "local",
+        "_key",
+    )
+
     def __init__(self, vtext: str) -> None:
         """Create a smart version from a string version number."""
         self.vtext = vtext
+        (
+            self.epoch,
+            self.release,
+            self.pre,
+            self.post,
+            self.dev,
+            self.local,
+            self._key,
+        ) = _parse_version(vtext)
 
     def __repr__(self):
         return f"<Version {self.vtext!r}>"
@@ -98,10 +207,15 @@ class Version:
 
     def __eq__(self, other):
         assert isinstance(other, Version)
-        return self.vtext.lstrip("v") == other.vtext.lstrip("v")
+        return self._key[1] == other._key[1]
+
+    def __lt__(self, other):
+        if not isinstance(other, Version):
+            return NotImplemented
+        return self._key < other._key
 
     def __hash__(self):
-        return hash(self.vtext.lstrip("v"))
+        return hash(self._key[1])
 
     @classmethod
     def from_text(cls, text: str) -> Version | None:
@@ -113,9 +227,8 @@ class Version:
 
     def is_prerelease(self) -> bool:  # noqa: D400
         """Is this version number a pre-release?"""
-        m = re.fullmatch(VERSION_REGEX, self.vtext)
-        assert m  # the version must be a valid version
-        return bool(m["pre"])
+        assert self.release is not None  # the version must be a valid version
+        return self.pre is not None or self.dev is not None
 
 
 def scriv_command(func):
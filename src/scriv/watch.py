@@ -0,0 +1,111 @@
+"""Watching fragments for changes."""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from .format import SectionDict
+from .scriv import Scriv
+
+logger = logging.getLogger(__name__)
+
+# How often to look for changed fragments, in seconds.
+WATCH_INTERVAL = 0.25
+
+
+class FragmentWatcher:
+    """
+    Keep the parsed sections of the fragments up to date.
+
+    Each call to `poll` re-scans the fragment directory, and re-parses only
+    the fragments that are new or whose modification time or size changed.
+    """
+
+    def __init__(self, scriv: Scriv):
+        """Create a watcher for the fragments of `scriv`."""
+        self.scriv = scriv
+        # For each fragment path, the (mtime, size) it had when it was read,
+        # and its sections, or None if it couldn't be read.
+        self._fragments: dict[
+            Path, tuple[tuple[int, int], SectionDict | None]
+        ] = {}
+        # Why the fragments that couldn't be read couldn't be read.
+        self.errors: dict[Path, str] = {}
+
+    def poll(self) -> bool:
+        """
+        Look for changed fragments, and re-read them.
+
+        Returns True if any fragments were added, changed, or removed.
+        """
+        changed = False
+        fragments = {}
+        for frag in self.scriv.fragments_to_combine():
+            try:
+                stat = os.stat(frag.path)
+            except FileNotFoundError:
+                # Removed since the directory was scanned.
+                continue
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            old = self._fragments.get(frag.path)
+            if old is not None and old[0] == stamp:
+                fragments[frag.path] = old
+                continue
+            changed = True
+            self.errors.pop(frag.path, None)
+            try:
+                sections = self.scriv.sections_from_fragment(frag)
+            except (OSError, ValueError) as exc:
+                logger.warning(f"Couldn't read {frag.path}: {exc}")
+                self.errors[frag.path] = str(exc)
+                sections = None
+            fragments[frag.path] = (stamp, sections)
+        if fragments.keys() != self._fragments.keys():
+            changed = True
+            for path in self.errors.keys() - fragments.keys():
+                del self.errors[path]
+        self._fragments = fragments
+        return changed
+
+    def fragment_sections(self) -> dict[Path, SectionDict | None]:
+        """
+        Get the sections of each fragment, or None if it couldn't be read.
+        """
+        return {
+            path: sections for path, (_, sections) in self._fragments.items()
+        }
+
+    def sections(self) -> SectionDict:
+        """
+        Get the combined sections of all the fragments.
+        """
+        return self.scriv.merge_sections(
+            sections
+            for _, sections in self._fragments.values()
+            if sections is not None
+        )
+
+
+def watch_fragments(
+    scriv: Scriv,
+    show: Callable[[SectionDict], None],
+) -> None:
+    """
+    Call `show` with the combined sections each time the fragments change.
+
+    Runs until interrupted with Ctrl-C.
+    """
+    watcher = FragmentWatcher(scriv)
+    directory = scriv.config.fragment_directory
+    logger.info(f"Watching {directory} for changes, press Ctrl-C to stop")
+    try:
+        while True:
+            if watcher.poll():
+                show(watcher.sections())
+            time.sleep(WATCH_INTERVAL)
+    except KeyboardInterrupt:
+        pass
@@ -20,6 +20,7 @@ if os.getenv("SCRIV_TEST_NO_EXTRAS", ""):
 
 # pylint: disable=wrong-import-position
 
+from scriv import gitinfo
 from scriv.cli import cli as scriv_cli
 
 from .faker import FakeGit, FakeRunCommand
@@ -35,6 +36,12 @@ def fake_run_command(mocker):
     return FakeRunCommand(mocker)
 
 
+@pytest.fixture(autouse=True)
+def new_git_info():
+    """Start each test without the git settings read by earlier tests."""
+    gitinfo.git_info.cache_clear()
+
+
 @pytest.fixture()
 def fake_git(fake_run_command) -> FakeGit:
     """Get a FakeGit to use in tests."""
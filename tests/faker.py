@@ -42,9 +42,9 @@ class FakeRunCommand:
         """
         self.handlers[argv0] = handler
 
-    def __call__(self, cmd: str) -> CmdResult:
+    def __call__(self, cmd: str | list[str]) -> CmdResult:
         """Do the faking!."""
-        argv = shlex.split(cmd)
+        argv = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
         if argv[0] in self.handlers:
             return self.handlers[argv[0]](argv)
         return (False, f"no fake command handler: {argv}")
@@ -65,8 +65,10 @@ class FakeGit:
         self.tags: set[str] = set()
         self.remotes: dict[str, tuple[str, str]] = {}
 
-        # Hook up our run_command handler.
+        # Hook up our run_command handler, also for the commands that
+        # gitinfo runs itself.
         frc.add_handler("git", self.run_command)
+        frc.patch_module("scriv.gitinfo")
 
     def run_command(self, argv: list[str]) -> CmdResult:
         """Simulate git commands."""
@@ -77,6 +79,14 @@ class FakeGit:
                     return (True, self.config[argv[3]] + "\n")
                 else:
                     return (False, f"error: no such key: {argv[3]}")
+            elif argv[2:] == ["--list", "-z"]:
+                return (
+                    True,
+                    "".join(
+                        f"{name}\n{value}\0"
+                        for name, value in self.config.items()
+                    ),
+                )
         elif argv[1:] == ["rev-parse", "--abbrev-ref", "HEAD"]:
             return (True, self.branch + "\n")
         elif argv[1:] == ["tag"]:
@@ -0,0 +1,72 @@
+"""Tests of scriv/cache.py"""
+
+from pathlib import Path
+
+from scriv.cache import SectionCache, section_cache
+from scriv.config import Config
+from scriv.format import SectionDict
+
+SECTIONS = {
+    None: ["Some text before."],
+    "1.0": ["Added\n-----", "- Something new."],
+}
+
+
+def test_round_trip(temp_dir):
+    cache = SectionCache(temp_dir / "cache")
+    key = cache.key("rst", "hello")
+    cache.put("thing", key, SECTIONS)
+    assert cache.get("thing", key) == SECTIONS
+    assert list(cache.get("thing", key) or {}) == [None, "1.0"]
+
+
+def test_missing_entry(temp_dir):
+    cache = SectionCache(temp_dir / "cache")
+    assert cache.get("thing", cache.key("rst", "hello")) is None
+
+
+def test_stale_key(temp_dir):
+    cache = SectionCache(temp_dir / "cache")
+    cache.put("thing", cache.key("rst", "hello"), SECTIONS)
+    assert cache.get("thing", cache.key("rst", "goodbye")) is None
+
+
+def test_keys_distinguish_parts():
+    assert SectionCache.key("ab", "c") != SectionCache.key("a", "bc")
+
+
+def test_corrupt_entry(temp_dir):
+    cache = SectionCache(temp_dir)
+    (temp_dir / "thing.json").write_text("{not json")
+    assert cache.get("thing", cache.key("x")) is None
+
+
+def test_unwritable_directory(temp_dir):
+    (temp_dir / "cache").write_text("I'm a file, not a directory")
+    cache = SectionCache(temp_dir / "cache")
+    # No exception, just nothing cached.
+    cache.put("thing", cache.key("x"), SECTIONS)
+    assert cache.get("thing", cache.key("x")) is None
+
+
+def test_no_cache_configured():
+    assert section_cache(Config()) is None
+
+
+def test_cache_configured():
+    cache = section_cache(Config(cache_directory=".cache/scriv"))
+    assert cache is not None
+    assert cache.directory == Path(".cache/scriv")
+
+
+def test_table_round_trip(temp_dir):
+    cache = SectionCache(temp_dir / "cache")
+    assert cache.get_table("things") == {}
+    table: dict[str, SectionDict] = {
+        cache.key("a"): SECTIONS,
+        cache.key("b"): {"Fixed": ["- Bug."]},
+    }
+    cache.put_table("things", table)
+    assert cache.get_table("things") == table
+    # A table isn't a single entry.
+    assert cache.get("things", cache.key("a")) is None
@@ -1,11 +1,16 @@
 """Tests of scriv/changelog.py"""
 
+import os
+import stat
+import sys
 from textwrap import dedent
 
 import pytest
 
+from scriv import format_rst
 from scriv.changelog import Changelog
 from scriv.config import Config
+from scriv.format import SectionDict
 
 A = dedent("""\
     Hello
@@ -79,3 +84,155 @@ def test_round_trip(text, temp_dir):
     assert changelog.entries() == BODY_SECTIONS
     changelog.write()
     assert path.read_text() == text
+
+
+def test_write_new_entry(temp_dir):
+    # A new entry written with the changelog is the same as one added first.
+    path = temp_dir / "foo.rst"
+    config = Config(start_marker="INSERT", end_marker="END")
+    path.write_text(A + ".. INSERT\n" + BODY + "(END)\n" + B)
+    sections: SectionDict = {"Fixed": ["- A bug.", "- Another bug."]}
+    changelog = Changelog(path, config)
+    changelog.read()
+    header = changelog.format_tools().format_header("2022-10-01")
+    changelog.write(header, sections)
+    streamed = path.read_text()
+
+    changelog.add_entry(header, changelog.entry_text(sections))
+    changelog.write()
+    assert streamed == path.read_text()
+    assert streamed.startswith(
+        A + ".. INSERT\n\n2022-10-01\n==========\n\nFixed\n-----\n\n"
+    )
+
+
+def test_cached_entries(temp_dir, mocker):
+    path = temp_dir / "foo.rst"
+    path.write_text(BODY)
+    config = Config(cache_directory="cache")
+    changelog = Changelog(path, config)
+    changelog.read()
+    assert changelog.entries() == BODY_SECTIONS
+    assert list((temp_dir / "cache").iterdir()) == [
+        temp_dir / "cache" / "changelog-foo.rst.json"
+    ]
+
+    # The second time, the text isn't parsed at all.
+    changelog = Changelog(path, config)
+    changelog.read()
+    parse_text = mocker.patch("scriv.format_rst.RstTools.parse_text")
+    assert changelog.entries() == BODY_SECTIONS
+    assert parse_text.call_count == 0
+
+    # A changed changelog is parsed again.
+    path.write_text(BODY.replace("Typos", "Spelling"))
+    changelog = Changelog(path, config)
+    changelog.read()
+    mocker.stopall()
+    entries = changelog.entries()
+    assert entries["2022-02-25"][-1] == "- Spelling corrected."
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+def test_write_keeps_mode(temp_dir):
+    path = temp_dir / "foo.rst"
+    path.write_text(BODY)
+    path.chmod(0o640)
+    changelog = Changelog(path, Config())
+    changelog.read()
+    changelog.add_entry("\nNew\n===\n", "\n- Something.\n")
+    changelog.write()
+    assert path.read_text().startswith("\nNew\n===\n")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+    assert os.listdir(temp_dir) == ["foo.rst"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+def test_write_new_file_mode(temp_dir):
+    # A new changelog gets the mode the umask gives new files, not the
+    # private mode of the temporary file it was written to.
+    path = temp_dir / "foo.rst"
+    changelog = Changelog(path, Config())
+    changelog.read()
+    changelog.add_entry("\nNew\n===\n", "\n- Something.\n")
+    changelog.write()
+    (temp_dir / "other.txt").write_text("")
+    other_mode = stat.S_IMODE((temp_dir / "other.txt").stat().st_mode)
+    assert stat.S_IMODE(path.stat().st_mode) == other_mode
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX only")
+def test_write_through_symlink(temp_dir):
+    real = temp_dir / "real.rst"
+    real.write_text(BODY)
+    link = temp_dir / "foo.rst"
+    link.symlink_to(real)
+    changelog = Changelog(link, Config())
+    changelog.read()
+    changelog.add_entry("\nNew\n===\n", "\n- Something.\n")
+    changelog.write()
+    assert link.is_symlink()
+    assert real.read_text().startswith("\nNew\n===\n")
+
+
+def test_failed_write_keeps_changelog(temp_dir, mocker):
+    path = temp_dir / "foo.rst"
+    path.write_text(BODY)
+    changelog = Changelog(path, Config())
+    changelog.read()
+    changelog.add_entry("\nNew\n===\n", "\n- Something.\n")
+    mocker.patch("os.fsync", side_effect=KeyboardInterrupt)
+    with pytest.raises(KeyboardInterrupt):
+        changelog.write()
+    assert path.read_text() == BODY
+    assert os.listdir(temp_dir) == ["foo.rst"]
+
+
+def test_iter_entries(temp_dir):
+    path = temp_dir / "foo.rst"
+    path.write_text(BODY)
+    changelog = Changelog(path, Config())
+    changelog.read()
+    assert list(changelog.iter_entries()) == list(BODY_SECTIONS.items())
+
+
+@pytest.mark.parametrize("cache_directory", ["", ".cache"])
+def test_iter_entries_duplicate_titles(temp_dir, cache_directory):
+    # Entries with the same title are merged, with or without a cache.
+    path = temp_dir / "foo.rst"
+    path.write_text(BODY + "\n" + BODY.partition("2022-02-25")[0])
+    changelog = Changelog(path, Config(cache_directory=cache_directory))
+    changelog.read()
+    expected = {
+        "2022-09-13": BODY_SECTIONS["2022-09-13"] * 2,
+        "2022-02-25": BODY_SECTIONS["2022-02-25"],
+    }
+    assert list(changelog.iter_entries()) == list(expected.items())
+    assert changelog.entries() == expected
+
+
+def test_iter_entries_duplicate_markdown_titles(temp_dir):
+    path = temp_dir / "foo.md"
+    path.write_text(
+        "# 1.1\n\n- Two.\n\n# 1.0\n\n- One.\n\n# 1.1 \n\n- More two.\n"
+    )
+    changelog = Changelog(path, Config(format="md"))
+    changelog.read()
+    assert list(changelog.iter_entries()) == [
+        ("1.1", ["- Two.", "- More two."]),
+        ("1.0", ["- One."]),
+    ]
+
+
+def test_iter_entries_stops_early(temp_dir, mocker):
+    path = temp_dir / "foo.rst"
+    path.write_text(BODY)
+    changelog = Changelog(path, Config())
+    changelog.read()
+    regex = mocker.patch.object(
+        format_rst, "LINE_KIND_REGEX", wraps=format_rst.LINE_KIND_REGEX
+    )
+    entries = changelog.iter_entries()
+    assert next(entries) == ("2022-09-13", BODY_SECTIONS["2022-09-13"])
+    # Only the first entry, up to the next heading, has been parsed.
+    assert regex.match.call_count == 10
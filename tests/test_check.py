@@ -0,0 +1,146 @@
+"""Test check logic."""
+
+import time
+
+import pytest
+
+FRAG = """\
+Fixed
+-----
+
+- Launching missiles no longer targets ourselves.
+"""
+
+EMPTY_FRAG = """\
+.. A new scriv changelog fragment.
+..
+.. Fixed
+.. -----
+"""
+
+BAD_CATEGORY_FRAG = """\
+Fixes
+-----
+
+- Misspelled the category.
+"""
+
+
+def test_check_good(cli_invoke, changelog_d, caplog):
+    (changelog_d / "20170616_nedbat.rst").write_text(FRAG)
+    (changelog_d / "20170617_nedbat.md").write_text("- Not categorized.\n")
+    cli_invoke(["check"])
+    assert "Checked 2 fragments" in caplog.text
+
+
+def test_check_no_fragments(cli_invoke, changelog_d, caplog):
+    cli_invoke(["check"])
+    assert "No changelog fragments to check" in caplog.text
+
+
+def test_check_problems(cli_invoke, changelog_d, caplog):
+    (changelog_d / "20170616_nedbat.rst").write_text(FRAG)
+    (changelog_d / "20170617_nedbat.rst").write_text(EMPTY_FRAG)
+    (changelog_d / "20170618_nedbat.rst").write_text(BAD_CATEGORY_FRAG)
+    (changelog_d / "20170619_nedbat.rst").write_bytes(b"\xff\xfe\xfd")
+    result = cli_invoke(["check"], expect_ok=False)
+    assert result.exit_code == 1
+    assert str(result.exception) == "3 problems in 4 fragments"
+    errors = [r.message for r in caplog.records if r.levelname == "ERROR"]
+    assert errors == [
+        "changelog.d/20170617_nedbat.rst: Fragment has no entries",
+        "changelog.d/20170618_nedbat.rst: Unknown category 'Fixes', should "
+        + "be one of: Removed, Added, Changed, Deprecated, Fixed, Security",
+        "changelog.d/20170619_nedbat.rst: Couldn't read fragment: "
+        + "'utf-8' codec can't decode byte 0xff in position 0: "
+        + "invalid start byte",
+    ]
+
+
+def test_check_empty_section(cli_invoke, changelog_d, caplog):
+    (changelog_d / "20170616_nedbat.rst").write_text(
+        "Added\n-----\n\n- A feature.\n\nFixed\n-----\n"
+    )
+    result = cli_invoke(["check"], expect_ok=False)
+    assert str(result.exception) == "1 problem in 1 fragments"
+    errors = [r.message for r in caplog.records if r.levelname == "ERROR"]
+    assert errors == [
+        "changelog.d/20170616_nedbat.rst: Section 'Fixed' has no entries",
+    ]
+
+
+def test_check_no_categories(cli_invoke, changelog_d):
+    # Without categories, any section is fine.
+    (changelog_d / "scriv.ini").write_text("[scriv]\ncategories =\n")
+    (changelog_d / "20170618_nedbat.rst").write_text(BAD_CATEGORY_FRAG)
+    cli_invoke(["check"])
+
+
+@pytest.fixture()
+def git_diff(fake_run_command):
+    """Fake `git diff`, returning the argv it was run with."""
+    runs = []
+
+    def fake_git_diff(argv):
+        runs.append(argv)
+        if argv[-3] == "nosuchref":
+            return False, "fatal: bad revision 'nosuchref'\n"
+        return True, (
+            "changelog.d/20170617_nedbat.rst\nchangelog.d/README.rst\n"
+        )
+
+    fake_run_command.add_handler("git", fake_git_diff)
+    fake_run_command.patch_module("scriv.gitinfo")
+    return runs
+
+
+def test_check_since(git_diff, cli_invoke, changelog_d, caplog):
+    # Only the changed fragments are checked.
+    (changelog_d / "20170616_nedbat.rst").write_text(EMPTY_FRAG)
+    (changelog_d / "20170617_nedbat.rst").write_text(FRAG)
+    (changelog_d / "README.rst").write_text("Not a fragment.")
+    cli_invoke(["check", "--since", "origin/main"])
+    assert git_diff == [
+        [
+            "git",
+            "diff",
+            "--name-only",
+            "--relative",
+            "--diff-filter=d",
+            "origin/main",
+            "--",
+            "changelog.d",
+        ]
+    ]
+    assert "Checked 1 fragments" in caplog.text
+
+
+def test_check_since_bad_ref(git_diff, cli_invoke, changelog_d):
+    (changelog_d / "20170617_nedbat.rst").write_text(FRAG)
+    result = cli_invoke(["check", "--since", "nosuchref"], expect_ok=False)
+    assert result.exit_code == 1
+    assert str(result.exception) == (
+        "Couldn't get changes since 'nosuchref': "
+        + "fatal: bad revision 'nosuchref'\n"
+    )
+
+
+def test_check_command_setting_run_once(
+    cli_invoke, temp_dir, changelog_d, mocker
+):
+    # Fragments are checked in threads, but a command: setting is run once.
+    (temp_dir / "setup.cfg").write_text(
+        "[scriv]\nstart_marker = command: get-marker\n"
+    )
+    for num in range(4):
+        (changelog_d / f"2017061{num}_nedbat.rst").write_text(FRAG)
+
+    def run_shell_command(cmd, timeout=None):  # pylint: disable=unused-argument
+        time.sleep(0.05)
+        return True, "scriv-start-here\n"
+
+    shell = mocker.patch(
+        "scriv.config.run_shell_command", side_effect=run_shell_command
+    )
+    cli_invoke(["check"])
+    assert shell.call_count == 1
@@ -0,0 +1,21 @@
+"""Tests of scriv/cli.py"""
+
+import click
+import pytest
+
+from scriv.cli import SUBCOMMANDS, cli
+
+
+@pytest.mark.parametrize("name", sorted(SUBCOMMANDS))
+def test_subcommand_help(name):
+    # The short help listed for a subcommand is the same as it has itself.
+    command = cli.get_command(click.Context(cli), name)
+    assert command is not None
+    assert command.name == name
+    assert command.get_short_help_str(limit=200) == SUBCOMMANDS[name][1]
+
+
+def test_unknown_subcommand(cli_invoke):
+    result = cli_invoke(["xyzzy"], expect_ok=False)
+    assert result.exit_code == 2
+    assert "No such command 'xyzzy'" in result.stderr
@@ -0,0 +1,41 @@
+"""Test the client command."""
+
+import pytest
+
+
+def test_client(cli_invoke, mocker):
+    send_request = mocker.patch(
+        "scriv.client.send_request",
+        return_value={"ok": True, "output": "- The first release.\n"},
+    )
+    result = cli_invoke(["client", "print", "1.0"])
+    assert result.stdout == "- The first release.\n"
+    send_request.assert_called_once_with(
+        ".scriv.sock", {"command": "print", "version": "1.0"}
+    )
+
+
+def test_client_error(cli_invoke, mocker):
+    mocker.patch(
+        "scriv.client.send_request",
+        return_value={"ok": False, "error": "No changelog fragments"},
+    )
+    result = cli_invoke(["client", "preview"], expect_ok=False)
+    assert result.exit_code == 1
+    assert str(result.exception) == "No changelog fragments"
+
+
+def test_no_server(cli_invoke):
+    result = cli_invoke(
+        ["client", "--socket", "nothing.sock", "check"], expect_ok=False
+    )
+    assert result.exit_code == 1
+    assert str(result.exception).startswith(
+        "Couldn't get a response from nothing.sock: "
+    )
+
+
+@pytest.mark.parametrize("command", ["collect", "xyzzy"])
+def test_bad_command(cli_invoke, command):
+    result = cli_invoke(["client", command], expect_ok=False)
+    assert result.exit_code == 2
@@ -161,6 +161,21 @@ def test_collect_mixed_format(cli_invoke, changelog_d, temp_dir):
     assert changelog_text == CHANGELOG_2_1_3
 
 
+@pytest.mark.parametrize("workers", ["1", "2", "8"])
+def test_collect_workers(workers, cli_invoke, changelog_d, temp_dir):
+    # However many threads read the fragments, the result is the same.
+    (changelog_d / "scriv.ini").write_text(
+        f"[scriv]\nfragment_workers = {workers}\n"
+    )
+    (changelog_d / "20170616_nedbat.md").write_text(COMMENT_MD + FRAG2_MD)
+    (changelog_d / "20170617_nedbat.rst").write_text(COMMENT + FRAG1)
+    (changelog_d / "20170618_joedev.rst").write_text(COMMENT + FRAG3)
+    with freezegun.freeze_time("2020-02-25T15:18:19"):
+        cli_invoke(["collect"])
+    changelog_text = (temp_dir / "CHANGELOG.rst").read_text()
+    assert changelog_text == CHANGELOG_2_1_3
+
+
 def test_collect_inserts_at_marker(cli_invoke, changelog_d, temp_dir):
     # Collected text is inserted into CHANGELOG where marked.
     changelog = temp_dir / "CHANGELOG.rst"
@@ -264,55 +279,38 @@ def test_collect_add(mocker, cli_invoke, changelog_d, temp_dir):
         cli_invoke(["collect", "--add"])
     changelog_text = (temp_dir / "CHANGELOG.rst").read_text()
     assert changelog_text == CHANGELOG_1_2
-    # We used --add, so the collected files were git rm'd
+    # We used --add, so the collected files were git rm'd, all at once.
+    frag1 = str((changelog_d / "20170616_nedbat.rst").relative_to(temp_dir))
+    frag2 = str((changelog_d / "20170617_nedbat.rst").relative_to(temp_dir))
     assert mock_call.mock_calls == [
         call(["git", "add", "CHANGELOG.rst"]),
-        call(
-            [
-                "git",
-                "rm",
-                str(
-                    (changelog_d / "20170616_nedbat.rst").relative_to(temp_dir)
-                ),
-            ]
-        ),
-        call(
-            [
-                "git",
-                "rm",
-                str(
-                    (changelog_d / "20170617_nedbat.rst").relative_to(temp_dir)
-                ),
-            ]
-        ),
+        call(["git", "rm", frag1, frag2]),
     ]
 
 
-def test_collect_add_rm_fail(mocker, cli_invoke, changelog_d, temp_dir):
+def test_collect_add_rm_fail(mocker, cli_invoke, changelog_d, temp_dir, caplog):
     # --add, but fail to remove a file.
     (changelog_d / "scriv.ini").write_text("# this shouldn't be collected\n")
     (changelog_d / "20170616_nedbat.rst").write_text(FRAG1)
     (changelog_d / "20170617_nedbat.rst").write_text(FRAG2)
     mock_call = mocker.patch("subprocess.call")
-    mock_call.side_effect = [0, 99]
+    mock_call.side_effect = [0, 99, 0, 99]
     with freezegun.freeze_time("2020-02-25T15:18:19"):
         result = cli_invoke(["collect", "--add"], expect_ok=False)
     assert result.exit_code == 99
     changelog_text = (temp_dir / "CHANGELOG.rst").read_text()
     assert changelog_text == CHANGELOG_1_2
-    # We used --add, so the collected files were git rm'd
+    # The batched git rm failed, so each file was tried by itself.
+    frag1 = str((changelog_d / "20170616_nedbat.rst").relative_to(temp_dir))
+    frag2 = str((changelog_d / "20170617_nedbat.rst").relative_to(temp_dir))
     assert mock_call.mock_calls == [
         call(["git", "add", "CHANGELOG.rst"]),
-        call(
-            [
-                "git",
-                "rm",
-                str(
-                    (changelog_d / "20170616_nedbat.rst").relative_to(temp_dir)
-                ),
-            ]
-        ),
+        call(["git", "rm", frag1, frag2]),
+        call(["git", "rm", frag1]),
+        call(["git", "rm", frag2]),
     ]
+    assert f"Removed {frag1}" in caplog.text
+    assert f"Couldn't remove {frag2}" in caplog.text
 
 
 def test_collect_edit(fake_git, mocker, cli_invoke, changelog_d, temp_dir):
@@ -430,6 +428,59 @@ def test_configure_skipped_fragments(cli_invoke, changelog_d, temp_dir):
     assert changelog_text == CHANGELOG_2_1_3
 
 
+def test_configure_several_skipped_fragments(cli_invoke, changelog_d, temp_dir):
+    (changelog_d / "scriv.ini").write_text(
+        "[scriv]\nskip_fragments =\n    ALL*\n    *_draft.*\n"
+    )
+    (changelog_d / "ALLABOUT.md").write_text("Don't take this file.")
+    (changelog_d / "20170615_nedbat_draft.rst").write_text("Nor this one.")
+    (changelog_d / "20170616_nedbat.md").write_text(COMMENT_MD + FRAG2_MD)
+    (changelog_d / "20170617_nedbat.rst").write_text(COMMENT + FRAG1)
+    (changelog_d / "20170618_joedev.rst").write_text(COMMENT + FRAG3)
+    with freezegun.freeze_time("2020-02-25T15:18:19"):
+        cli_invoke(["collect"])
+    changelog_text = (temp_dir / "CHANGELOG.rst").read_text()
+    assert changelog_text == CHANGELOG_2_1_3
+
+
+def test_subdirectories_ignored(cli_invoke, changelog_d, temp_dir):
+    # Without fragment_subdirectories, subdirectories aren't collected, even
+    # if they look like fragments.
+    (changelog_d / "Fixed").mkdir()
+    (changelog_d / "Fixed" / "20170615_nedbat.rst").write_text("- Not me.\n")
+    (changelog_d / "20170615_nedbat.rst").mkdir()
+    (changelog_d / "20170616_nedbat.md").write_text(COMMENT_MD + FRAG2_MD)
+    (changelog_d / "20170617_nedbat.rst").write_text(COMMENT + FRAG1)
+    (changelog_d / "20170618_joedev.rst").write_text(COMMENT + FRAG3)
+    with freezegun.freeze_time("2020-02-25T15:18:19"):
+        cli_invoke(["collect"])
+    changelog_text = (temp_dir / "CHANGELOG.rst").read_text()
+    assert changelog_text == CHANGELOG_2_1_3
+    assert (changelog_d / "Fixed" / "20170615_nedbat.rst").exists()
+
+
+def test_category_subdirectories(cli_invoke, changelog_d, temp_dir):
+    # Fragments can be in subdirectories, ordered by their file names. In a
+    # category's subdirectory, text outside any section is in that category.
+    (changelog_d / "scriv.ini").write_text(
+        "[scriv]\nfragment_subdirectories = true\n"
+    )
+    (changelog_d / "Fixed").mkdir()
+    (changelog_d / "Other").mkdir()
+    (changelog_d / "20170616_nedbat.md").write_text(COMMENT_MD + FRAG2_MD)
+    (changelog_d / "Fixed" / "README.rst").write_text("Fixes go here.")
+    (changelog_d / "Fixed" / "20170617_nedbat.rst").write_text(
+        COMMENT + "- Launching missiles no longer targets ourselves.\n"
+    )
+    (changelog_d / "Other" / "20170618_joedev.rst").write_text(COMMENT + FRAG3)
+    with freezegun.freeze_time("2020-02-25T15:18:19"):
+        cli_invoke(["collect"])
+    changelog_text = (temp_dir / "CHANGELOG.rst").read_text()
+    assert changelog_text == CHANGELOG_2_1_3
+    assert not (changelog_d / "Fixed" / "20170617_nedbat.rst").exists()
+    assert (changelog_d / "Fixed" / "README.rst").exists()
+
+
 def test_no_fragments(cli_invoke, changelog_d, temp_dir, caplog):
     (changelog_d / "README.rst").write_text("This directory has fragments")
     (temp_dir / "CHANGELOG.rst").write_text("Not much\n")
@@ -1,6 +1,8 @@
 """Tests of scriv/config.py"""
 
+import os
 import re
+import threading
 from textwrap import dedent
 
 import pytest
@@ -116,7 +118,7 @@ def test_defaults(temp_dir):
     assert "{{ date.strftime('%Y-%m-%d') }}" in config.entry_title_template
     assert config.main_branches == ["master", "main", "develop"]
     assert config.fragment_name_fields == ["created", "author", "branch"]
-    assert config.skip_fragments == "README.*"
+    assert config.skip_fragments == ["README.*"]
     assert config.version == ""
 
 
@@ -325,6 +327,20 @@ def test_rst_chars_is_two_chars(chars):
         Config(rst_header_chars=chars)
 
 
+@pytest.mark.parametrize("workers", ["", "0", "-1", "many"])
+def test_fragment_workers_is_a_number(workers):
+    msg = rf"Invalid configuration: 'fragment_workers' must match.*'{workers}'"
+    with pytest.raises(ScrivException, match=msg):
+        Config(fragment_workers=workers)
+
+
+@pytest.mark.parametrize("timeout", ["x", "-1", "1s", ".5"])
+def test_command_timeout_is_a_number(timeout):
+    msg = rf"Invalid configuration: 'command_timeout' must match.*'{timeout}'"
+    with pytest.raises(ScrivException, match=msg):
+        Config(command_timeout=timeout)
+
+
 @pytest.mark.parametrize("chars", ["#", "#=-", "# ", "  "])
 def test_md_setext_chars_is_two_chars(chars):
     # md_setext_chars must be exactly two non-space characters.
@@ -396,6 +412,14 @@ class TestTomlConfig:
             config = Config.read()
         assert config.categories[0] == "Removed"
 
+    @pytest.mark.skipif(tomllib is None, reason="No TOML support installed")
+    def test_toml_without_scriv_isnt_parsed(self, temp_dir, mocker):
+        (temp_dir / "pyproject.toml").write_text(GENERIC_TOML_CONFIG)
+        loads = mocker.patch("scriv.config.tomllib.loads")
+        config = Config.read()
+        assert config.categories[0] == "Removed"
+        loads.assert_not_called()
+
     @pytest.mark.skipif(tomllib is None, reason="No TOML support installed")
     def test_nonstring_options(self, temp_dir):
         # Some config options are allowed to be e.g. TOML integers; for these,
@@ -419,7 +443,8 @@ class TestTomlConfig:
 def test_command_running(mocker, cmd_output, result):
     # Any setting can be the output of a command.
     mocker.patch(
-        "scriv.config.run_shell_command", lambda cmd: (True, cmd_output)
+        "scriv.config.run_shell_command",
+        lambda cmd, timeout=None: (True, cmd_output),
     )
     text = Config(changelog="command: doesnt-matter").changelog
     assert text == result
@@ -449,6 +474,79 @@ def test_bad_command(fake_run_command, bad_cmd, msg_rx):
         _ = Config(changelog=f"command: {bad_cmd}").changelog
 
 
+def test_command_timeout():
+    config = Config(changelog="command: sleep 10", command_timeout="0.2")
+    msg = (
+        r"Couldn't read 'changelog' setting: Command 'sleep 10' failed:\n"
+        + r"Timed out after 0.2 seconds"
+    )
+    with pytest.raises(ScrivException, match=msg):
+        _ = config.changelog
+
+
+def test_resolution_times(changelog_d):
+    (changelog_d / "start.txt").write_text("start here")
+    config = Config(
+        start_marker="file: start.txt",
+        changelog="command: echo CHANGES.rst",
+    )
+    assert config.start_marker == "start here"
+    assert config.changelog == "CHANGES.rst"
+    assert config.end_marker == "scriv-end-here"
+    assert sorted(config.resolution_times) == ["changelog", "start_marker"]
+    assert all(secs >= 0 for secs in config.resolution_times.values())
+
+
+def test_resolve_eagerly(mocker, temp_dir):
+    (temp_dir / "setup.cfg").write_text(
+        dedent(
+            """\
+            [scriv]
+            resolve_eagerly = true
+            version = command: get-version
+            start_marker = command: get-marker
+            ghrel_template = command: get-template
+            """
+        )
+    )
+    threads = {}
+
+    def run_shell_command(cmd, timeout=None):  # pylint: disable=unused-argument
+        threads[cmd] = threading.current_thread().name
+        return True, cmd.upper() + "\n"
+
+    mocker.patch("scriv.config.run_shell_command", run_shell_command)
+    config = Config.read()
+    # The commands have all been run, in threads, before being used.
+    assert sorted(threads) == ["get-marker", "get-template", "get-version"]
+    assert all(name.startswith("scriv-config") for name in threads.values())
+    # The default new_fragment_template is read from a file.
+    assert sorted(config.resolution_times) == [
+        "ghrel_template",
+        "new_fragment_template",
+        "start_marker",
+        "version",
+    ]
+    assert config.version == "GET-VERSION"
+    assert config.start_marker == "GET-MARKER"
+    assert len(threads) == 3
+
+
+def test_resolve_eagerly_fails_early(temp_dir):
+    (temp_dir / "setup.cfg").write_text(
+        dedent(
+            """\
+            [scriv]
+            resolve_eagerly = true
+            version = command: xyzzyplugh
+            """
+        )
+    )
+    msg = r"Couldn't read 'version' setting: Command 'xyzzyplugh' failed:"
+    with pytest.raises(ScrivException, match=msg):
+        Config.read()
+
+
 def test_old_and_new(temp_dir):
     (temp_dir / "tox.ini").write_text(
         dedent(
@@ -476,3 +574,149 @@ def test_old_and_new_toml(temp_dir):
     )
     config = Config.read()
     assert config.changelog == "README.md"
+
+
+def test_origins(temp_dir, changelog_d):
+    (temp_dir / "tox.ini").write_text(
+        "[scriv]\noutput_file = NEWS.rst\nformat = md\n"
+    )
+    (changelog_d / "scriv.ini").write_text("[scriv]\nformat = rst\n")
+    config = Config.read()
+    assert config.origins == {
+        "changelog": "tox.ini (output_file)",
+        "format": "changelog.d/scriv.ini",
+    }
+
+
+class TestConfigCache:
+    """
+    Tests of caching the configuration with SCRIV_CONFIG_CACHE.
+    """
+
+    @pytest.fixture(autouse=True)
+    def config_cache(self, temp_dir, monkeypatch):
+        """Cache configuration in a temp directory."""
+        monkeypatch.setenv("SCRIV_CONFIG_CACHE", str(temp_dir / "cache"))
+
+    @pytest.fixture()
+    def read_one_config(self, mocker):
+        """Spy on reading configuration files."""
+        return mocker.spy(Config, "read_one_config")
+
+    def test_cached(self, temp_dir, changelog_d, read_one_config):
+        (changelog_d / "start.txt").write_text("Start here")
+        (temp_dir / "setup.cfg").write_text(
+            "[scriv]\nformat = md\nstart_marker = file: start.txt\n"
+        )
+        config = Config.read()
+        assert read_one_config.call_count == 3
+        assert config.start_marker == "Start here"
+
+        read_one_config.reset_mock()
+        config = Config.read()
+        assert read_one_config.call_count == 0
+        assert config.format == "md"
+        assert config.start_marker == "Start here"
+        assert config.origins == {
+            "format": "setup.cfg",
+            "start_marker": "setup.cfg",
+        }
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            # A settings file changes.
+            lambda temp_dir: (temp_dir / "setup.cfg").write_text(
+                "[scriv]\nformat = rst\nstart_marker = file: start.txt\n"
+            ),
+            # A settings file that didn't exist appears.
+            lambda temp_dir: (temp_dir / "tox.ini").write_text(
+                "[scriv]\nformat = rst\n"
+            ),
+            # A file read for a setting changes.
+            lambda temp_dir: (temp_dir / "changelog.d/start.txt").write_text(
+                "Begin here"
+            ),
+        ],
+    )
+    def test_invalidated(self, temp_dir, changelog_d, read_one_config, change):
+        (changelog_d / "start.txt").write_text("Start here")
+        (temp_dir / "setup.cfg").write_text(
+            "[scriv]\nformat = md\nstart_marker = file: start.txt\n"
+        )
+        Config.read()
+        change(temp_dir)
+        read_one_config.reset_mock()
+        config = Config.read()
+        assert read_one_config.call_count == 3
+        assert (config.format, config.start_marker) != ("md", "Start here")
+
+    def test_commands_not_cached(self, temp_dir, mocker):
+        (temp_dir / "setup.cfg").write_text(
+            dedent(
+                """\
+                [scriv]
+                version = command: get-version
+                start_marker = command: get-marker
+                cache_commands = start_marker
+                """
+            )
+        )
+        commands = []
+
+        def run_shell_command(cmd, timeout=None):  # pylint: disable=unused-argument
+            commands.append(cmd)
+            return True, cmd.upper() + "\n"
+
+        mocker.patch("scriv.config.run_shell_command", run_shell_command)
+        config = Config.read()
+        # Caching the configuration ran the cacheable command.
+        assert commands == ["get-marker"]
+        assert config.version == "GET-VERSION"
+        assert commands == ["get-marker", "get-version"]
+
+        commands.clear()
+        config = Config.read()
+        assert config.start_marker == "GET-MARKER"
+        assert config.version == "GET-VERSION"
+        assert commands == ["get-version"]
+
+    def test_resolve_eagerly(self, temp_dir, mocker, read_one_config):
+        (temp_dir / "setup.cfg").write_text(
+            dedent(
+                """\
+                [scriv]
+                resolve_eagerly = true
+                version = command: get-version
+                """
+            )
+        )
+        threads = {}
+
+        def run_shell_command(cmd, timeout=None):  # pylint: disable=unused-argument
+            threads[cmd] = threading.current_thread().name
+            return True, cmd.upper() + "\n"
+
+        mocker.patch("scriv.config.run_shell_command", run_shell_command)
+        Config.read()
+        threads.clear()
+        read_one_config.reset_mock()
+        config = Config.read()
+        # The cached configuration is used, but the uncached command is
+        # still run eagerly, in a thread.
+        assert read_one_config.call_count == 0
+        assert list(threads) == ["get-version"]
+        assert threads["get-version"].startswith("scriv-config")
+        assert "version" in config.resolution_times
+        assert config.version == "GET-VERSION"
+
+    def test_other_directory(self, temp_dir, read_one_config):
+        # A cached configuration is only used in the same directory.
+        (temp_dir / "setup.cfg").write_text("[scriv]\nformat = md\n")
+        Config.read()
+        (temp_dir / "sub").mkdir()
+        os.chdir(temp_dir / "sub")
+        read_one_config.reset_mock()
+        config = Config.read()
+        assert read_one_config.call_count == 3
+        assert config.format == "rst"
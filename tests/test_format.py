@@ -0,0 +1,123 @@
+"""Tests of scriv/format.py"""
+
+import importlib.metadata
+
+import pytest
+
+from scriv import format as scriv_format
+from scriv.config import Config
+from scriv.exceptions import ScrivException
+from scriv.format import FormatTools, get_format_tools, known_formats
+from scriv.format_md import MdTools
+from scriv.format_rst import RstTools
+
+
+class TxtTools(FormatTools):
+    """A plain-text format, for testing plugin formats."""
+
+    def iter_sections(self, text):
+        section = None
+        paragraphs: list[str] = []
+        for para in text.split("\n\n"):
+            if para.startswith("* "):
+                if paragraphs:
+                    yield section, paragraphs
+                section, paragraphs = para[2:], []
+            else:
+                paragraphs.append(para.strip())
+        if paragraphs:
+            yield section, paragraphs
+
+    def format_header(self, text, anchor=None):
+        return f"\n== {text} ==\n"
+
+    def iter_section_lines(self, sections):
+        for section, paragraphs in sections.items():
+            if section:
+                yield f"* {section}"
+            yield from paragraphs
+
+    def convert_to_markdown(self, text, name="", fail_if_warn=False):
+        return text
+
+
+@pytest.fixture()
+def plugin_formats(mocker):
+    """Make the "txt" and "bad" formats available as plugin formats."""
+    entry_points = [
+        importlib.metadata.EntryPoint(
+            name=name, value=value, group=scriv_format.ENTRY_POINT_GROUP
+        )
+        for name, value in [
+            ("txt", "tests.test_format:TxtTools"),
+            ("bad", "tests.test_format:plugin_formats"),
+            # A plugin can't replace a built-in format.
+            ("rst", "tests.test_format:TxtTools"),
+        ]
+    ]
+    mocker.patch(
+        "importlib.metadata.entry_points",
+        lambda group: [ep for ep in entry_points if ep.group == group],
+    )
+    # pylint: disable=protected-access
+    scriv_format._plugin_formats.cache_clear()
+    scriv_format._format_class.cache_clear()
+    yield
+    scriv_format._plugin_formats.cache_clear()
+    scriv_format._format_class.cache_clear()
+
+
+def test_builtin_formats():
+    config = Config()
+    assert isinstance(get_format_tools("rst", config), RstTools)
+    assert isinstance(get_format_tools("md", config), MdTools)
+
+
+def test_format_tools_are_reused():
+    config1 = Config()
+    config2 = Config()
+    tools = get_format_tools("rst", config1)
+    assert get_format_tools("rst", config1) is tools
+    assert get_format_tools("rst", config2) is not tools
+    assert get_format_tools("md", config1) is not tools
+
+
+@pytest.mark.usefixtures("plugin_formats")
+def test_plugin_format():
+    assert known_formats() == ["rst", "md", "bad", "txt"]
+    config = Config(format="txt")
+    tools = get_format_tools("txt", config)
+    assert isinstance(tools, TxtTools)
+    assert tools.parse_text("Hi.\n\n* Added\n\nA thing.\n\nAnother.") == {
+        None: ["Hi."],
+        "Added": ["A thing.", "Another."],
+    }
+    assert isinstance(get_format_tools("rst", config), RstTools)
+
+
+@pytest.mark.usefixtures("plugin_formats")
+def test_bad_plugin_format():
+    with pytest.raises(ScrivException, match=r"Format 'bad' from .* isn't a"):
+        get_format_tools("bad", Config(format="bad"))
+
+
+@pytest.mark.usefixtures("plugin_formats")
+def test_unknown_plugin_format():
+    with pytest.raises(
+        ScrivException,
+        match=r"'format' must be in \['rst', 'md', 'bad', 'txt'\] \(got 'org'\)",
+    ):
+        Config(format="org")
+    with pytest.raises(ScrivException, match=r"Unknown format: 'org'"):
+        get_format_tools("org", Config())
+
+
+@pytest.mark.usefixtures("plugin_formats")
+def test_collect_plugin_format(cli_invoke, changelog_d, temp_dir):
+    (changelog_d / "scriv.ini").write_text("[scriv]\nformat = txt\n")
+    (changelog_d / "20170616_nedbat.txt").write_text("* Fixed\n\n- A bug.\n")
+    (changelog_d / "20170617_nedbat.md").write_text("# Added\n\n- A thing.\n")
+    cli_invoke(["collect", "--title", "Hello"])
+    assert (temp_dir / "CHANGELOG.txt").read_text() == (
+        "\n== Hello ==\n* Added\n- A thing.\n* Fixed\n- A bug."
+    )
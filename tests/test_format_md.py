@@ -1,6 +1,7 @@
 """Tests for scriv/format_md.py."""
 
 import collections
+import io
 import textwrap
 
 import pytest
@@ -198,6 +199,36 @@ def test_parse_text(text, parsed):
     assert actual == parsed
 
 
+def test_iter_sections():
+    text = textwrap.dedent("""\
+        Intro text.
+
+        # Added
+
+        - One thing.
+
+        # Fixed
+
+        - A fix.
+
+        # Added
+
+        - Another thing.
+        """)
+    sections = list(MdTools().iter_sections(text))
+    assert sections == [
+        (None, ["Intro text."]),
+        ("Added", ["- One thing."]),
+        ("Fixed", ["- A fix."]),
+        ("Added", ["- Another thing."]),
+    ]
+    assert MdTools().parse_text(text) == {
+        None: ["Intro text."],
+        "Added": ["- One thing.", "- Another thing."],
+        "Fixed": ["- A fix."],
+    }
+
+
 @pytest.mark.parametrize(
     "config_kwargs, sections, expected",
     [
@@ -329,8 +360,13 @@ def test_parse_text(text, parsed):
 )
 def test_format_sections(config_kwargs, sections, expected):
     sections = collections.OrderedDict(sections)
-    actual = MdTools(Config(**config_kwargs)).format_sections(sections)
+    tools = MdTools(Config(**config_kwargs))
+    actual = tools.format_sections(sections)
     assert actual == textwrap.dedent(expected)
+    # Writing the sections to a stream produces the same text.
+    stream = io.StringIO()
+    tools.write_sections(sections, stream)
+    assert stream.getvalue() == actual
 
 
 @pytest.mark.parametrize(
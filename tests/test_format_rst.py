@@ -1,6 +1,7 @@
 """Tests for scriv/format_rst.py."""
 
 import collections
+import io
 import re
 import textwrap
 
@@ -354,8 +355,13 @@ def test_parse_text(text, parsed):
 )
 def test_format_sections(config_kwargs, sections, expected):
     sections = collections.OrderedDict(sections)
-    actual = RstTools(Config(**config_kwargs)).format_sections(sections)
+    tools = RstTools(Config(**config_kwargs))
+    actual = tools.format_sections(sections)
     assert actual == textwrap.dedent(expected)
+    # Writing the sections to a stream produces the same text.
+    stream = io.StringIO()
+    tools.write_sections(sections, stream)
+    assert stream.getvalue() == actual
 
 
 @pytest.mark.parametrize(
@@ -1,8 +1,23 @@
 """Tests of gitinfo.py"""
 
+import logging
 import re
+from pathlib import Path
+from unittest.mock import call
 
-from scriv.gitinfo import current_branch_name, get_github_repos, user_nick
+import pytest
+
+from scriv.gitinfo import (
+    current_branch_name,
+    get_github_repos,
+    git_add_files,
+    git_config,
+    git_config_bool,
+    git_rm_files,
+    user_nick,
+)
+
+from .faker import FakeRunCommand
 
 
 def test_user_nick_from_scriv_user_nick(fake_git):
@@ -32,6 +47,43 @@ def test_user_nick_from_nowhere(fake_git, monkeypatch):
     assert user_nick() == "somebody"
 
 
+def test_git_settings_read_once(fake_git, mocker):
+    fake_git.set_config("user.email", "joesomeone@somewhere.org")
+    fake_git.set_config("scriv.create.add", "true")
+    run = mocker.spy(FakeRunCommand, "__call__")
+    assert user_nick() == "joesomeone"
+    assert git_config_bool("scriv.create.add")
+    assert not git_config_bool("scriv.create.edit")
+    assert [c.args[1] for c in run.call_args_list] == [
+        ["git", "config", "--list", "-z"]
+    ]
+
+
+def test_git_settings_case(fake_git):
+    fake_git.set_config("GitHub.User", "joedev")
+    assert git_config("github.user") == "joedev"
+    assert git_config("GITHUB.user") == "joedev"
+
+
+def test_git_settings_no_value(fake_run_command):
+    fake_run_command.patch_module("scriv.gitinfo")
+    fake_run_command.add_handler(
+        "git", lambda argv: (True, "scriv.create.edit\0user.name\nJoe\0")
+    )
+    assert git_config_bool("scriv.create.edit")
+    assert not git_config_bool("scriv.create.add")
+
+
+def test_other_git_settings(fake_git, mocker):
+    # Settings that scriv doesn't use are read on their own.
+    fake_git.set_config("core.editor", "vim")
+    run = mocker.spy(FakeRunCommand, "__call__")
+    assert git_config("core.editor") == "vim"
+    assert [c.args[1] for c in run.call_args_list] == [
+        "git config --get core.editor"
+    ]
+
+
 def test_current_branch_name(fake_git):
     fake_git.set_branch("joedev/feature-123")
     assert current_branch_name() == "joedev/feature-123"
@@ -78,3 +130,37 @@ def test_real_get_github_repos():
     repo = repos.pop()
     assert re.fullmatch(r"[\w-]+/[\w-]+", repo)
     assert not repo.endswith(".git")
+
+
+def test_git_add_files_in_batches(mocker, caplog):
+    caplog.set_level(logging.INFO)
+    mocker.patch("scriv.gitinfo.MAX_COMMAND_LENGTH", 30)
+    mock_call = mocker.patch("subprocess.call", return_value=0)
+    git_add_files(Path(f"file{i}.rst") for i in range(5))
+    # "git add" is 7, and each file name with a space is 10: two fit in 30.
+    assert mock_call.mock_calls == [
+        call(["git", "add", "file0.rst", "file1.rst"]),
+        call(["git", "add", "file2.rst", "file3.rst"]),
+        call(["git", "add", "file4.rst"]),
+    ]
+    assert "Added file4.rst" in caplog.text
+
+
+def test_git_rm_files_failure(mocker, caplog):
+    # If a batch fails, its files are retried one at a time, and the rest of
+    # the files are still done.
+    caplog.set_level(logging.INFO)
+    mocker.patch("scriv.gitinfo.MAX_COMMAND_LENGTH", 20)
+    mock_call = mocker.patch("subprocess.call", side_effect=[1, 0, 128, 0])
+    with pytest.raises(SystemExit) as exc_info:
+        git_rm_files([Path("a.rst"), Path("b.rst"), Path("c.rst")])
+    assert exc_info.value.code == 128
+    assert mock_call.mock_calls == [
+        call(["git", "rm", "a.rst", "b.rst"]),
+        call(["git", "rm", "a.rst"]),
+        call(["git", "rm", "b.rst"]),
+        call(["git", "rm", "c.rst"]),
+    ]
+    assert "Removed a.rst" in caplog.text
+    assert "Couldn't remove b.rst" in caplog.text
+    assert "Removed c.rst" in caplog.text
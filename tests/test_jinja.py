@@ -0,0 +1,56 @@
+"""Tests of scriv/jinja.py"""
+
+import jinja2
+import pytest
+
+from scriv import jinja
+from scriv.config import Config
+from scriv.jinja import get_template
+
+
+@pytest.fixture(autouse=True)
+def new_environments():
+    """Start each test without any compiled templates."""
+    jinja._environment.cache_clear()  # pylint: disable=protected-access
+
+
+def test_templates_are_compiled_once(mocker):
+    compile_ = mocker.spy(jinja2.Environment, "compile")
+    config = Config()
+    template = get_template(config, "Hello {{ name }}!\n")
+    assert template.render(name="world") == "Hello world!"
+    assert get_template(config, "Hello {{ name }}!\n") is template
+    assert get_template(Config(), "Hello {{ name }}!\n") is template
+    assert compile_.call_count == 1
+
+
+def test_keep_trailing_newline():
+    config = Config()
+    template = get_template(
+        config, "Hello {{ name }}!\n", keep_trailing_newline=True
+    )
+    assert template.render(name="world") == "Hello world!\n"
+    assert get_template(config, "Hello {{ name }}!\n") is not template
+
+
+def test_bytecode_cache(temp_dir, mocker):
+    config = Config(cache_directory=".cache")
+    source = "Version {{ version }} for {{ who }}"
+    assert get_template(config, source).render(version=1, who="me") == (
+        "Version 1 for me"
+    )
+    assert list((temp_dir / ".cache" / "jinja").iterdir())
+
+    # A new process would start with a new environment, and needn't compile
+    # the template again.
+    jinja._environment.cache_clear()  # pylint: disable=protected-access
+    compile_ = mocker.spy(jinja2.Environment, "compile")
+    template = get_template(config, source)
+    assert template.render(version=2, who="you") == "Version 2 for you"
+    assert compile_.call_count == 0
+
+
+def test_unwritable_cache_directory(temp_dir):
+    (temp_dir / "not_a_dir").write_text("Hello")
+    config = Config(cache_directory="not_a_dir")
+    assert get_template(config, "{{ 1 + 2 }}").render() == "3"
@@ -8,7 +8,7 @@ import pytest
 
 import scriv.literals
 from scriv.exceptions import ScrivException
-from scriv.literals import find_literal
+from scriv.literals import find_literal, find_literals
 from scriv.optional import tomllib, yaml
 
 
@@ -74,6 +74,26 @@ def test_find_python_literal(name, value, temp_dir):
     assert find_literal("foo.py", name) == value
 
 
+def test_find_python_literals(temp_dir, mocker):
+    with open("foo.py", "w", encoding="utf-8") as f:
+        f.write(PYTHON_CODE)
+    parse = mocker.spy(scriv.literals.ast, "parse")
+    assert find_literals("foo.py", ["version", "also", "how_many"]) == {
+        "version": "1.2.3",
+        "also": "xyzzy",
+        "how_many": None,
+    }
+    assert find_literal("foo.py", "but") == "hello there"
+    # The file was only parsed once.
+    assert parse.call_count == 1
+
+    # Once the file changes, it's parsed again.
+    with open("foo.py", "a", encoding="utf-8") as f:
+        f.write("version = '9.8.7'\n")
+    assert find_literal("foo.py", "version") == "9.8.7"
+    assert parse.call_count == 2
+
+
 def test_unknown_file_type(temp_dir):
     with open("what.xyz", "w", encoding="utf-8") as f:
         f.write("Hello there!")
@@ -169,6 +189,18 @@ def test_find_yaml_literal(name, value, temp_dir):
     assert find_literal("foo.yml", name) == value
 
 
+@pytest.mark.skipif(yaml is None, reason="No YAML support installed")
+def test_yaml_fast_loader(temp_dir, mocker):
+    with open("foo.yml", "w", encoding="utf-8") as f:
+        f.write(YAML_LITERAL)
+    assert yaml is not None
+    load = mocker.spy(yaml, "load")
+    assert find_literal("foo.yml", "version") == "1.2.3"
+    assert load.call_args.kwargs["Loader"] is getattr(
+        yaml, "CSafeLoader", yaml.SafeLoader
+    )
+
+
 def test_find_yaml_literal_fail_if_unavailable(monkeypatch):
     monkeypatch.setattr(scriv.literals, "yaml", None)
     with pytest.raises(
@@ -232,6 +264,8 @@ CABAL_LITERAL = dedent("""\
     "name, value",
     [
         ("version", "1.2.3"),
+        ("name", "pkg"),
+        ("license", None),
     ],
 )
 def test_find_cabal_literal(name, value, temp_dir):
@@ -1,10 +1,15 @@
 """Test print logic."""
 
+import io
 from textwrap import dedent
 
 import freezegun
 import pytest
 
+from scriv import format_rst
+from scriv.cache import SectionCache
+from scriv.print import write_stripped
+
 CHANGELOG_HEADER = dedent("""\
 
     1.2 - 2020-02-25
@@ -20,6 +25,39 @@ FRAG = dedent("""\
     """)
 
 
+def test_print_cached_fragments(
+    cli_invoke, changelog_d, temp_dir, capsys, mocker
+):
+    (changelog_d / "scriv.ini").write_text(
+        "[scriv]\ncache_directory = .cache\n"
+    )
+    (changelog_d / "20170616_nedbat.rst").write_text(FRAG)
+    (changelog_d / "20170617_nedbat.rst").write_text("- An update.\n")
+    cli_invoke(["print"])
+    first = capsys.readouterr().out
+    assert (temp_dir / ".cache" / "fragments.json").exists()
+
+    # Only new or changed fragments are parsed the second time.
+    (changelog_d / "20170617_nedbat.rst").write_text("- A better update.\n")
+    (changelog_d / "20170618_nedbat.rst").write_text(FRAG)
+    parse_text = mocker.spy(format_rst.RstTools, "parse_text")
+    cli_invoke(["print"])
+    assert parse_text.call_count == 1
+    assert capsys.readouterr().out == first.replace(
+        "An update", "A better update"
+    ).replace(
+        "- Launching missiles no longer targets ourselves.\n",
+        "- Launching missiles no longer targets ourselves.\n\n"
+        + "- Launching missiles no longer targets ourselves.\n",
+    )
+
+    # Fragments that are gone are dropped from the cache.
+    assert len(SectionCache(temp_dir / ".cache").get_table("fragments")) == 2
+    (changelog_d / "20170617_nedbat.rst").unlink()
+    cli_invoke(["print"])
+    assert len(SectionCache(temp_dir / ".cache").get_table("fragments")) == 1
+
+
 @pytest.mark.parametrize("newline", ("\r\n", "\n"))
 def test_print_fragment(newline, cli_invoke, changelog_d, temp_dir, capsys):
     fragment = FRAG.replace("\n", newline).encode("utf-8")
@@ -92,3 +130,171 @@ def test_print_version_not_in_changelog(cli_invoke, changelog_d, temp_dir):
 
     assert result.exit_code == 2
     assert "Unable to find version 123.456 in the changelog" in result.stderr
+
+
+@pytest.mark.parametrize("cache", [False, True])
+def test_print_duplicated_version(cache, cli_invoke, temp_dir, capsys):
+    if cache:
+        (temp_dir / "setup.cfg").write_text("[scriv]\ncache_directory = .c\n")
+    (temp_dir / "CHANGELOG.rst").write_text(
+        dedent("""\
+            1.0
+            ===
+
+            - First part.
+
+            0.9
+            ===
+
+            - Earlier.
+
+            1.0
+            ===
+
+            - Second part.
+            """)
+    )
+
+    cli_invoke(["print", "--version", "1.0"])
+
+    assert capsys.readouterr().out == "- First part.\n\n- Second part.\n"
+
+
+CHANGELOG_MANY = dedent("""\
+
+    1.3 - 2020-03-01
+    ================
+
+    - Third.
+
+    Not a version
+    =============
+
+    - Ignored.
+
+    1.2 - 2020-02-25
+    ================
+
+    - Second.
+
+    1.1 - 2020-02-01
+    ================
+
+    - First.
+
+    - Also first.
+    """)
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        (["--since", "1.2"], ["1.3", "Third", "1.2", "Second"]),
+        (["--until", "1.2"], ["1.2", "Second", "1.1", "First"]),
+        (["--since", "1.2", "--until", "1.2"], ["1.2", "Second"]),
+        (["--since", "1.1", "--until", "v1.3"], ["1.3", "1.2", "1.1"]),
+    ],
+)
+def test_print_range(args, expected, cli_invoke, temp_dir, capsys):
+    (temp_dir / "CHANGELOG.rst").write_text(CHANGELOG_MANY)
+
+    cli_invoke(["print", *args])
+
+    std = capsys.readouterr()
+    positions = [std.out.index(word) for word in expected]
+    assert positions == sorted(positions)
+    assert "Ignored" not in std.out
+    assert not any(v in std.out for v in {"1.1", "1.2", "1.3"} - {*expected})
+
+
+def test_print_range_output(cli_invoke, temp_dir, capsys):
+    (temp_dir / "CHANGELOG.rst").write_text(CHANGELOG_MANY)
+    output_file = temp_dir / "output.txt"
+
+    cli_invoke(["print", "--since", "1.2", "--output", output_file])
+
+    assert capsys.readouterr().out == ""
+    assert output_file.read_text() == dedent("""\
+        1.3 - 2020-03-01
+        ================
+
+        - Third.
+
+        1.2 - 2020-02-25
+        ================
+
+        - Second.""")
+
+
+@pytest.mark.parametrize("newline", ("\r\n", "\n"))
+def test_print_split_dir(newline, cli_invoke, temp_dir):
+    changelog = CHANGELOG_MANY.replace("\n", newline).encode("utf-8")
+    (temp_dir / "CHANGELOG.rst").write_bytes(changelog)
+
+    cli_invoke(["print", "--split-dir", "versions"])
+
+    versions = temp_dir / "versions"
+    assert sorted(p.name for p in versions.iterdir()) == [
+        "1.1.rst",
+        "1.2.rst",
+        "1.3.rst",
+    ]
+    assert (versions / "1.2.rst").read_bytes() == b"- Second."
+    assert (versions / "1.1.rst").read_bytes() == (
+        "- First." + newline * 2 + "- Also first."
+    ).encode("utf-8")
+
+
+def test_print_no_range_matches(cli_invoke, temp_dir):
+    (temp_dir / "CHANGELOG.rst").write_text(CHANGELOG_MANY)
+
+    result = cli_invoke(["print", "--since", "2.0"], expect_ok=False)
+
+    assert result.exit_code == 2
+    assert "No matching entries in the changelog" in result.stderr
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (
+            ["--version", "1.2", "--since", "1.0"],
+            "Can't provide --version with --since or --until.",
+        ),
+        (
+            ["--output", "out.txt", "--split-dir", "versions"],
+            "Can't provide both --output and --split-dir.",
+        ),
+        (
+            ["--since", "banana"],
+            "--since 'banana' isn't a version number.",
+        ),
+        (
+            ["--since", "1.0", "--until", "latest"],
+            "--until 'latest' isn't a version number.",
+        ),
+    ],
+)
+def test_print_bad_options(args, message, cli_invoke, temp_dir):
+    result = cli_invoke(["print", *args], expect_ok=False)
+
+    assert result.exit_code == 1
+    assert str(result.exception) == message
+
+
+@pytest.mark.parametrize(
+    "parts",
+    [
+        ["a", "b"],
+        ["\n\n  a\r\n\n", "", "  ", "b\r", "\n", "c  \n\n"],
+        ["a\r", "b\n", "\r\nc"],
+        ["", " \n", "\t"],
+    ],
+)
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_write_stripped(parts, newline):
+    # The output is the same as joining, stripping, and converting newlines.
+    outfile = io.StringIO()
+    write_stripped(parts, outfile, newline)
+    expected = newline.join("\n".join(parts).strip().splitlines())
+    assert outfile.getvalue() == expected
@@ -2,6 +2,8 @@
 
 import sys
 
+import pytest
+
 from scriv import __version__
 from scriv.shell import run_command
 
@@ -12,3 +14,34 @@ def test_dashm():
     assert ok
     assert "Usage: scriv [OPTIONS] COMMAND [ARGS]..." in output
     assert "Version " + __version__ in output
+
+
+# Print the modules imported by running a scriv command.
+IMPORTED_MODULES = """\
+import sys
+from scriv.cli import cli
+try:
+    cli({args!r})
+except SystemExit:
+    pass
+print("Imported:", *sorted(sys.modules))
+"""
+
+
+@pytest.mark.parametrize(
+    "args, not_imported",
+    [
+        (["--help"], ["attr", "jinja2", "markdown_it", "requests", "yaml"]),
+        (["create", "--help"], ["jinja2", "markdown_it", "requests"]),
+    ],
+)
+def test_startup_imports(args, not_imported):
+    # Starting scriv shouldn't import modules it won't need, since they make
+    # it slow to start.
+    ok, output = run_command(
+        [sys.executable, "-c", IMPORTED_MODULES.format(args=args)]
+    )
+    assert ok, output
+    imported = output.rpartition("Imported:")[2].split()
+    for module in not_imported:
+        assert module not in imported
@@ -0,0 +1,266 @@
+"""Test the serve command, and the ScrivServer it uses."""
+
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+from scriv import format_rst
+from scriv.changelog import Changelog
+from scriv.client import send_request
+from scriv.serve import ScrivServer, _Server, is_listening
+
+from .test_watch import FRAG, touch_later
+
+CHANGELOG = """\
+1.1 -- 2022-05-01
+=================
+
+Fixed
+-----
+
+- Everything works now.
+
+1.0 -- 2022-04-01
+=================
+
+- The first release.
+"""
+
+
+def test_preview(changelog_d, mocker):
+    (changelog_d / "20170616_nedbat.rst").write_text(FRAG)
+    parse_text = mocker.spy(format_rst.RstTools, "parse_text")
+    server = ScrivServer()
+    response = server.handle({"command": "preview"})
+    assert response == {
+        "ok": True,
+        "output": (
+            "Fixed\n-----\n\n"
+            + "- Launching missiles no longer targets ourselves.\n"
+        ),
+    }
+    # Asking again doesn't read the fragment again.
+    assert server.handle({"command": "preview"}) == response
+    assert parse_text.call_count == 1
+
+    touch_later(changelog_d / "20170617_nedbat.rst", "- An update.\n")
+    response = server.handle({"command": "preview"})
+    assert response["output"].startswith("- An update.\n\nFixed\n")
+    assert parse_text.call_count == 2
+
+
+def test_preview_nothing(changelog_d):
+    response = ScrivServer().handle({"command": "preview"})
+    assert response == {
+        "ok": False,
+        "error": "No changelog fragments to collect",
+    }
+
+
+def test_preview_unreadable(changelog_d):
+    (changelog_d / "20170616_nedbat.rst").write_text(FRAG)
+    (changelog_d / "20170617_nedbat.rst").write_bytes(b"\xff\xfe\xfd")
+    server = ScrivServer()
+    response = server.handle({"command": "preview"})
+    assert not response["ok"]
+    assert response["error"].startswith(
+        "changelog.d/20170617_nedbat.rst: Couldn't read fragment: "
+    )
+
+    (changelog_d / "20170617_nedbat.rst").unlink()
+    assert server.handle({"command": "preview"})["ok"]
+
+
+def test_check(changelog_d):
+    (changelog_d / "20170616_nedbat.rst").write_text(FRAG)
+    server = ScrivServer()
+    assert server.handle({"command": "check"}) == {
+        "ok": True,
+        "output": "Checked 1 fragments\n",
+    }
+    (changelog_d / "20170617_nedbat.rst").write_text(
+        "Nothing\n-------\n\n- Nope.\n"
+    )
+    (changelog_d / "20170618_nedbat.rst").write_bytes(b"\xff\xfe\xfd")
+    response = server.handle({"command": "check"})
+    assert not response["ok"]
+    lines = response["error"].splitlines()
+    assert lines[0].startswith(
+        "changelog.d/20170617_nedbat.rst: Unknown category 'Nothing'"
+    )
+    assert lines[1].startswith(
+        "changelog.d/20170618_nedbat.rst: Couldn't read fragment: "
+    )
+    assert lines[-1] == "2 problems in 3 fragments"
+
+
+def test_print(temp_dir, mocker):
+    (temp_dir / "CHANGELOG.rst").write_text(CHANGELOG)
+    read = mocker.spy(Changelog, "read")
+    server = ScrivServer()
+    assert server.handle({"command": "print", "version": "1.0"}) == {
+        "ok": True,
+        "output": "- The first release.\n",
+    }
+    assert server.handle({"command": "print", "version": "v1.1"}) == {
+        "ok": True,
+        "output": "Fixed\n-----\n\n- Everything works now.\n",
+    }
+    assert read.call_count == 1
+
+    touch_later(
+        temp_dir / "CHANGELOG.rst",
+        "1.2\n===\n\n- More.\n\n" + CHANGELOG,
+    )
+    assert server.handle({"command": "print", "version": "1.2"}) == {
+        "ok": True,
+        "output": "- More.\n",
+    }
+    assert read.call_count == 2
+
+
+def test_print_missing(temp_dir):
+    (temp_dir / "CHANGELOG.rst").write_text(CHANGELOG)
+    server = ScrivServer()
+    assert server.handle({"command": "print", "version": "2.0"}) == {
+        "ok": False,
+        "error": "Unable to find version 2.0 in the changelog",
+    }
+    assert server.handle({"command": "print"}) == {
+        "ok": False,
+        "error": "A print request needs a version",
+    }
+
+
+def test_create(changelog_d, temp_dir):
+    response = ScrivServer().handle({"command": "create"})
+    assert response["ok"]
+    path = temp_dir / response["output"].strip()
+    assert path.parent == changelog_d
+    assert "Uncomment the section that is right" in path.read_text()
+
+
+def test_create_git_settings_change(changelog_d, fake_git):
+    server = ScrivServer()
+    fake_git.set_config("github.user", "joedev")
+    assert "_joedev." in server.handle({"command": "create"})["output"]
+    fake_git.set_config("github.user", "janedev")
+    assert "_janedev." in server.handle({"command": "create"})["output"]
+
+
+def test_create_add(changelog_d, fake_git, mocker):
+    # Like scriv create, the scriv.create.add git setting adds the fragment.
+    fake_git.set_config("scriv.create.add", "true")
+    mock_call = mocker.patch("subprocess.call", return_value=0)
+    response = ScrivServer().handle({"command": "create"})
+    assert response["ok"]
+    path = response["output"].strip()
+    mock_call.assert_called_once_with(["git", "add", path])
+
+
+def test_create_add_fails(changelog_d, fake_git, mocker):
+    fake_git.set_config("scriv.create.add", "true")
+    mocker.patch("subprocess.call", return_value=1)
+    response = ScrivServer().handle({"command": "create"})
+    assert not response["ok"]
+    assert response["error"].startswith("Couldn't add changelog.d")
+
+
+def test_create_no_directory(temp_dir):
+    response = ScrivServer().handle({"command": "create"})
+    assert response == {
+        "ok": False,
+        "error": (
+            "Output directory 'changelog.d' doesn't exist, please create it."
+        ),
+    }
+
+
+def test_config_changes(changelog_d, temp_dir):
+    (changelog_d / "20170616_nedbat.rst").write_text(FRAG)
+    server = ScrivServer()
+    assert server.handle({"command": "preview"})["output"].startswith(
+        "Fixed\n-----\n"
+    )
+    touch_later(temp_dir / "setup.cfg", "[scriv]\nrst_header_chars = ~.\n")
+    assert server.handle({"command": "preview"})["output"].startswith(
+        "Fixed\n.....\n"
+    )
+
+
+@pytest.mark.parametrize(
+    "request_, error",
+    [
+        ({"command": "xyzzy"}, "Unknown request: 'xyzzy'"),
+        ({}, "Unknown request: None"),
+        (["preview"], "Requests must be JSON objects"),
+    ],
+)
+def test_bad_requests(temp_dir, request_, error):
+    assert ScrivServer().handle(request_) == {"ok": False, "error": error}
+
+
+@pytest.fixture()
+def running_server(changelog_d):
+    """Run a server in a thread, and return its socket path."""
+    socket_path = ".scriv.sock"
+    server = _Server(socket_path, ScrivServer())
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        yield socket_path
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+        os.unlink(socket_path)
+
+
+def test_socket(running_server, changelog_d):
+    (changelog_d / "20170616_nedbat.rst").write_text(FRAG)
+    assert is_listening(running_server)
+    response = send_request(running_server, {"command": "check"})
+    assert response == {"ok": True, "output": "Checked 1 fragments\n"}
+
+
+def test_concurrent_clients(running_server):
+    # A client keeping its connection open doesn't block other clients.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(running_server)
+        sock.sendall(b'{"command": "check"}\n')
+        with sock.makefile("rb") as lines:
+            response = json.loads(lines.readline())
+        assert response == {"ok": True, "output": "Checked 0 fragments\n"}
+
+        responses = []
+        thread = threading.Thread(
+            target=lambda: responses.append(
+                send_request(running_server, {"command": "check"})
+            )
+        )
+        thread.start()
+        thread.join(timeout=10)
+        assert responses == [{"ok": True, "output": "Checked 0 fragments\n"}]
+
+
+def test_already_running(running_server, cli_invoke):
+    result = cli_invoke(["serve"], expect_ok=False)
+    assert result.exit_code == 1
+    assert str(result.exception) == (
+        "A scriv server is already listening on .scriv.sock"
+    )
+
+
+def test_stale_socket(temp_dir, cli_invoke, mocker):
+    (temp_dir / ".scriv.sock").write_text("")
+    assert not is_listening(".scriv.sock")
+    serve_forever = mocker.patch.object(
+        _Server, "serve_forever", side_effect=KeyboardInterrupt
+    )
+    cli_invoke(["serve"])
+    assert serve_forever.call_count == 1
+    assert not (temp_dir / ".scriv.sock").exists()
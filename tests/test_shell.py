@@ -0,0 +1,118 @@
+"""Tests of scriv/shell.py"""
+
+import json
+import sys
+import time
+
+import freezegun
+import pytest
+
+from scriv.shell import (
+    CommandRecorder,
+    call_command,
+    recorder,
+    run_command,
+    run_shell_command,
+)
+
+
+@pytest.fixture()
+def recording():
+    """Record commands with the global recorder during a test."""
+    recorder.enable()
+    try:
+        yield recorder
+    finally:
+        recorder.disable()
+
+
+def test_disabled_recorder_does_nothing():
+    crec = CommandRecorder()
+    with crec.record(["true"]) as result:
+        result["returncode"] = 0
+    assert not crec.records
+
+
+def test_run_command_is_recorded(recording):
+    cmd = [sys.executable, "-c", "print('hello')"]
+    assert run_command(cmd) == (True, "hello\n")
+    [rec] = recording.records
+    assert rec.cmd == cmd
+    assert not rec.shell
+    assert rec.returncode == 0
+    assert rec.output_bytes == len(b"hello\n")
+    assert rec.duration_ns > 0
+
+
+def test_run_shell_command_is_recorded(recording):
+    ok, _ = run_shell_command("exit 17")
+    assert not ok
+    [rec] = recording.records
+    assert rec.cmd == "exit 17"
+    assert rec.shell
+    assert rec.returncode == 17
+    assert rec.output_bytes == 0
+
+
+def test_run_shell_command_timeout(recording):
+    start = time.monotonic()
+    # The background sleep keeps the output pipe open, so the shell's whole
+    # process group has to be killed.
+    ok, out = run_shell_command("echo early; sleep 10 & sleep 10", timeout=0.5)
+    assert time.monotonic() - start < 5
+    assert not ok
+    assert out == "Timed out after 0.5 seconds\nearly\n"
+    [rec] = recording.records
+    assert rec.returncode != 0
+
+
+def test_call_command_is_recorded(recording, mocker):
+    mocker.patch("subprocess.call", return_value=3)
+    assert call_command(["git", "add", "foo.rst"]) == 3
+    [rec] = recording.records
+    assert rec.returncode == 3
+    assert rec.output_bytes is None
+
+
+def test_trace_json(recording):
+    run_command([sys.executable, "-c", "import sys; sys.exit(1)"])
+    run_shell_command("echo hi")
+    trace = recording.trace_json()
+    [resource_spans] = trace["resourceSpans"]
+    [scope_spans] = resource_spans["scopeSpans"]
+    assert scope_spans["scope"]["name"] == "scriv.shell"
+    root, failed, shell = scope_spans["spans"]
+    assert root["name"] == "scriv"
+    assert "parentSpanId" not in root
+    for span in [failed, shell]:
+        assert span["traceId"] == root["traceId"]
+        assert span["parentSpanId"] == root["spanId"]
+        assert int(span["startTimeUnixNano"]) <= int(span["endTimeUnixNano"])
+    assert failed["status"] == {"code": 2}
+    assert {"key": "process.exit.code", "value": {"intValue": "1"}} in failed[
+        "attributes"
+    ]
+    assert shell["name"] == "echo hi"
+    assert shell["status"] == {"code": 1}
+    assert {"key": "scriv.output.bytes", "value": {"intValue": "3"}} in shell[
+        "attributes"
+    ]
+
+
+def test_trace_option(mocker, fake_git, cli_invoke, changelog_d, temp_dir):
+    fake_git.set_config("github.user", "joedev")
+    mocker.patch("subprocess.call", return_value=0)
+    with freezegun.freeze_time("2013-02-25T15:16:17"):
+        cli_invoke(["--trace", "trace.json", "create", "--add"])
+    assert not recorder.enabled
+    trace = json.loads((temp_dir / "trace.json").read_text())
+    spans = trace["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["scriv", "git add"]
+
+
+def test_profile_reports_commands(mocker, fake_git, cli_invoke, changelog_d):
+    fake_git.set_config("github.user", "joedev")
+    mocker.patch("subprocess.call", return_value=0)
+    result = cli_invoke(["--profile", "create", "--add"])
+    assert "Commands: 1 run, " in result.stderr
+    assert "[0]  git add changelog.d" in result.stderr
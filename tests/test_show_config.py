@@ -0,0 +1,77 @@
+"""Test the config command."""
+
+from textwrap import dedent
+
+import pytest
+
+
+@pytest.fixture()
+def setup_cfg(temp_dir):
+    """Make a setup.cfg with some scriv settings."""
+    (temp_dir / "setup.cfg").write_text(
+        dedent(
+            """\
+            [scriv]
+            format = md
+            output_file = NEWS.md
+            categories = Added, Fixed
+            version = command: echo 1.2.3
+            """
+        )
+    )
+
+
+@pytest.mark.usefixtures("setup_cfg")
+def test_show_values(cli_invoke):
+    result = cli_invoke(["config", "version", "categories", "end_marker"])
+    assert result.stdout == "1.2.3\nAdded\nFixed\nscriv-end-here\n"
+
+
+@pytest.mark.usefixtures("setup_cfg")
+def test_dump(cli_invoke):
+    result = cli_invoke(["config", "--dump"])
+    lines = result.stdout.splitlines()
+    assert "format = 'md'  # setup.cfg" in lines
+    assert "changelog = 'NEWS.md'  # setup.cfg (output_file)" in lines
+    assert "categories = ['Added', 'Fixed']  # setup.cfg" in lines
+    assert "version = '1.2.3'  # setup.cfg: 'command: echo 1.2.3'" in lines
+    assert "end_marker = 'scriv-end-here'  # default" in lines
+    assert any(
+        line.startswith("new_fragment_template = '<!--")
+        and line.endswith("# default: 'file: new_fragment.${config:format}.j2'")
+        for line in lines
+    )
+
+
+@pytest.mark.usefixtures("setup_cfg")
+def test_dump_some(cli_invoke):
+    result = cli_invoke(["config", "--dump", "format", "md_header_level"])
+    assert result.stdout == (
+        "format = 'md'  # setup.cfg\nmd_header_level = '1'  # default\n"
+    )
+
+
+def test_dump_bad_setting(cli_invoke, temp_dir):
+    (temp_dir / "setup.cfg").write_text(
+        "[scriv]\nversion = command: xyzzyplugh\n"
+    )
+    result = cli_invoke(["config", "--dump", "version"])
+    assert result.stdout.startswith(
+        "version = <Couldn't read 'version' setting: Command 'xyzzyplugh' "
+        + "failed:"
+    )
+    assert result.stdout.endswith("  # setup.cfg: 'command: xyzzyplugh'\n")
+
+
+def test_unknown_setting(cli_invoke, temp_dir):
+    result = cli_invoke(["config", "format", "xyzzy"], expect_ok=False)
+    assert result.exit_code == 1
+    assert str(result.exception) == "Scriv configuration has no 'xyzzy' option"
+
+
+def test_nothing_to_show(cli_invoke, temp_dir):
+    result = cli_invoke(["config"], expect_ok=False)
+    assert result.exit_code == 1
+    assert str(result.exception) == (
+        "Give the names of settings to show, or use --dump."
+    )
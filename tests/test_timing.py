@@ -0,0 +1,77 @@
+"""Tests of scriv/timing.py"""
+
+import pstats
+
+import pytest
+
+from scriv.timing import PhaseTimer, timed_iter, timer
+
+
+@pytest.fixture()
+def fake_clock(mocker):
+    """Make time.perf_counter return 0, 1, 2, 3, ..."""
+    clock = iter(range(1000))
+    mocker.patch("scriv.timing.time.perf_counter", lambda: next(clock))
+
+
+def test_disabled_timer_does_nothing(fake_clock):
+    ptimer = PhaseTimer()
+    with ptimer.phase("parse"):
+        pass
+    assert not ptimer.totals
+
+
+def test_phases_are_exclusive(fake_clock):
+    ptimer = PhaseTimer()
+    ptimer.enable()  # t=0
+    with ptimer.phase("parse"):  # t=1
+        with ptimer.phase("config"):  # t=2
+            pass  # t=3
+        with ptimer.phase("config"):  # t=4
+            pass  # t=5
+    # parse ends at t=6
+    assert ptimer.totals == {"parse": 3, "config": 2}
+    assert ptimer.counts == {"parse": 1, "config": 2}
+
+
+def test_report(fake_clock):
+    ptimer = PhaseTimer()
+    ptimer.enable()  # t=0
+    with ptimer.phase("write"):  # t=1
+        pass  # t=2
+    with ptimer.phase("discovery"):  # t=3
+        pass  # t=4
+    # report at t=5
+    assert ptimer.report().splitlines() == [
+        "Phase times:",
+        "  discovery       1.000s  (1 times)",
+        "  write           1.000s  (1 times)",
+        "  other           3.000s",
+        "  total           5.000s",
+    ]
+
+
+def test_timed_iter(fake_clock):
+    timer.enable()  # t=0
+    try:
+        items = timed_iter("parse", iter([1, 2]))
+        assert next(items) == 1  # t=1, t=2
+        assert list(items) == [2]  # t=3, t=4, and t=5, t=6 to end
+    finally:
+        timer.disable()
+    assert timer.totals == {"parse": 3}
+    assert timer.counts == {"parse": 3}
+
+
+def test_profile_option(cli_invoke, changelog_d, temp_dir, capsys):
+    (changelog_d / "20170616_nedbat.rst").write_text("- A fix.\n")
+    cli_invoke(["--profile", "--profile-file", "scriv.prof", "print"])
+
+    std = capsys.readouterr()
+    assert std.out == "- A fix.\n"
+    assert "Phase times:" in std.err
+    assert "  discovery " in std.err
+    assert "  parse " in std.err
+    assert not timer.enabled
+    stats = pstats.Stats(str(temp_dir / "scriv.prof"))
+    assert stats.get_stats_profile().func_profiles
@@ -25,6 +25,8 @@ def test_version_from_text(text, ver):
     [
         "v1.2.3",
         "17.4.1.3",
+        "1.2.3.post1",
+        "1.2.3+local.7",
     ],
 )
 def test_is_not_prerelease_version(version):
@@ -36,6 +38,7 @@ def test_is_not_prerelease_version(version):
     [
         "v1.2.3a1",
         "17.4.1.3-beta.2",
+        "1.2.3.dev4",
     ],
 )
 def test_is_prerelease_version(version):
@@ -64,6 +67,65 @@ def test_version_hashing(ver1, ver2, equal):
     assert len({Version(ver1), Version(ver2)}) == (1 if equal else 2)
 
 
+def test_version_ordering():
+    versions = [
+        "1.0.post1",
+        "1.0",
+        "1.0+local",
+        "1!0.1",
+        "1.0a1",
+        "v0.9",
+        "not-a-version",
+        "1.0rc1",
+        "1.0.dev1",
+        "1.0a1.dev1",
+        "1.0beta2",
+        "1.0.0",
+        "1.0.10",
+        "1.0.9",
+    ]
+    assert [str(v) for v in sorted(map(Version, versions))] == [
+        "not-a-version",
+        "v0.9",
+        "1.0.dev1",
+        "1.0a1.dev1",
+        "1.0a1",
+        "1.0beta2",
+        "1.0rc1",
+        "1.0",
+        "1.0.0",
+        "1.0+local",
+        "1.0.post1",
+        "1.0.9",
+        "1.0.10",
+        "1!0.1",
+    ]
+
+
+def test_version_parts():
+    v = Version("v1!2.3.4rc5.post6.dev7+ubuntu.8")
+    assert v.epoch == 1
+    assert v.release == (2, 3, 4)
+    assert v.pre == ("rc", 5)
+    assert v.post == 6
+    assert v.dev == 7
+    assert v.local == ("ubuntu", "8")
+
+
+def test_version_release_keeps_zeros():
+    v = Version("1.0.0")
+    assert v.release == (1, 0, 0)
+    # The zeros are only ignored for ordering.
+    assert v < Version("1.0.post1")
+
+
+def test_version_not_a_version():
+    v = Version("hello")
+    assert v.release is None
+    assert v == Version("hello")
+    assert v < Version("0.1")
+
+
 @pytest.mark.parametrize(
     "text, result",
     [
@@ -72,6 +134,9 @@ def test_version_hashing(ver1, ver2, equal):
         ("one\ntXo\nthree\n", ("one\n", "tXo\n", "three\n")),
         ("one\ntwo\ntXree\n", ("one\ntwo\n", "tXree\n", "")),
         ("one\ntXo\ntXree\n", ("one\n", "tXo\n", "tXree\n")),
+        ("one\r\ntXo\r\nthree", ("one\r\n", "tXo\r\n", "three")),
+        ("one\ntwo\ntXree", ("one\ntwo\n", "tXree", "")),
+        ("one\x0ctXo\rthree", ("one\x0c", "tXo\r", "three")),
     ],
 )
 def test_partition_lines(text, result):
@@ -0,0 +1,127 @@
+"""Test watching fragments."""
+
+import os
+from collections.abc import Callable
+
+import pytest
+
+from scriv import format_rst
+from scriv.scriv import Scriv
+from scriv.watch import FragmentWatcher
+
+FRAG = """\
+Fixed
+-----
+
+- Launching missiles no longer targets ourselves.
+"""
+
+
+def touch_later(path, text):
+    """Write `path`, and make sure its modification time changes."""
+    old_mtime = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text)
+    os.utime(path, ns=(old_mtime + 1_000_000_000,) * 2)
+
+
+def test_watcher_reparses_changed_fragments(changelog_d, mocker):
+    (changelog_d / "20170616_nedbat.rst").write_text(FRAG)
+    (changelog_d / "20170617_nedbat.rst").write_text("- An update.\n")
+    parse_text = mocker.spy(format_rst.RstTools, "parse_text")
+    watcher = FragmentWatcher(Scriv())
+    assert watcher.poll()
+    assert parse_text.call_count == 2
+    assert watcher.sections() == {
+        None: ["- An update."],
+        "Fixed": ["- Launching missiles no longer targets ourselves."],
+    }
+
+    # Nothing changed: nothing is parsed.
+    assert not watcher.poll()
+    assert parse_text.call_count == 2
+
+    # Only the changed fragment is parsed again.
+    touch_later(changelog_d / "20170617_nedbat.rst", "- A better update.\n")
+    assert watcher.poll()
+    assert parse_text.call_count == 3
+    assert watcher.sections()[None] == ["- A better update."]
+
+    # Removing a fragment is a change, but needs no parsing.
+    (changelog_d / "20170616_nedbat.rst").unlink()
+    assert watcher.poll()
+    assert parse_text.call_count == 3
+    assert watcher.sections() == {None: ["- A better update."]}
+
+
+def test_watcher_bad_fragment(changelog_d, caplog):
+    (changelog_d / "20170616_nedbat.rst").write_text(FRAG)
+    (changelog_d / "20170617_nedbat.rst").write_bytes(b"\xff\xfe\xfd")
+    watcher = FragmentWatcher(Scriv())
+    assert watcher.poll()
+    assert "Couldn't read changelog.d/20170617_nedbat.rst: " in caplog.text
+    assert list(watcher.sections()) == ["Fixed"]
+    bad = changelog_d.relative_to(changelog_d.parent) / "20170617_nedbat.rst"
+    assert list(watcher.errors) == [bad]
+    touch_later(changelog_d / "20170617_nedbat.rst", "- Fixed it.\n")
+    assert watcher.poll()
+    assert list(watcher.sections()) == [None, "Fixed"]
+    assert not watcher.errors
+
+
+@pytest.fixture()
+def fake_sleep(mocker):
+    """
+    Replace the sleep in the watch loop with a list of functions to call.
+
+    When the functions run out, the loop is interrupted.
+    """
+    actions: list[Callable[[], object]] = []
+
+    def sleep(_secs):
+        if not actions:
+            raise KeyboardInterrupt
+        actions.pop(0)()
+
+    mocker.patch("scriv.watch.time.sleep", sleep)
+    return actions
+
+
+def test_print_watch(fake_sleep, cli_invoke, changelog_d):
+    frag = changelog_d / "20170616_nedbat.rst"
+    frag.write_text(FRAG)
+    fake_sleep.extend(
+        [
+            # Nothing changed: nothing is printed.
+            lambda: None,
+            lambda: touch_later(frag, "- Something else.\n"),
+            frag.unlink,
+        ]
+    )
+    result = cli_invoke(["print", "--watch"])
+    assert result.stdout == FRAG + "- Something else.\n"
+    assert "Watching changelog.d for changes" in result.stderr
+    assert "No changelog fragments to collect" in result.stderr
+
+
+def test_print_watch_output(fake_sleep, cli_invoke, changelog_d, temp_dir):
+    frag = changelog_d / "20170616_nedbat.rst"
+    frag.write_text(FRAG)
+    output = temp_dir / "preview.rst"
+    contents = []
+    fake_sleep.extend(
+        [
+            lambda: contents.append(output.read_text()),
+            lambda: touch_later(frag, "- Something else.\n"),
+            lambda: contents.append(output.read_text()),
+        ]
+    )
+    cli_invoke(["print", "--watch", "--output", str(output)])
+    assert contents == [FRAG.strip(), "- Something else."]
+
+
+def test_print_watch_not_changelog(cli_invoke):
+    result = cli_invoke(["print", "--watch", "--version", "1.2"], False)
+    assert result.exit_code == 1
+    assert str(result.exception) == (
+        "--watch only prints fragments, not changelog entries."
+    )